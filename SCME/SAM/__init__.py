@@ -13,7 +13,7 @@
 #                   numpy-accelerated).  Exposes:
 #
 #       analyze_and_choreograph_json(
-#           samples_list,   # list[int] — mono Int16, downsampled to 11 025 Hz
+#           samples_list,   # Int16Array | list[int] — mono Int16, downsampled to 11 025 Hz
 #           sample_rate,    # int — 11 025
 #           band,           # str — "rock" | "munch"
 #           title,          # str — show title
@@ -3,11 +3,12 @@
 # =============================================================================
 #
 # Self-contained: no file I/O, only stdlib + numpy (bundled in Pyodide 0.27).
+# orjson is used for serialisation when installed (desktop CPython only).
 #
 # Entry point (called from JS via Pyodide globals):
 #
 #   json_str = analyze_and_choreograph_json(
-#       samples_list,   # list[int]  — mono Int16, downsampled to 11 025 Hz
+#       samples_list,   # Int16Array | list[int] — mono Int16, downsampled to 11 025 Hz
 #       sample_rate,    # int        — must match the downsampled rate
 #       band,           # str        — "rock" | "munch"
 #       title,          # str        — show title
@@ -41,6 +42,8 @@
 
 import json
 import math
+from bisect import bisect_left as _bisect_left, insort as _insort
+from itertools import accumulate as _accumulate
 
 try:
     import numpy as _np
@@ -48,6 +51,11 @@ try:
 except ImportError:
     _HAS_NUMPY = False
 
+try:
+    import orjson as _orjson     # optional C serialiser (not in Pyodide)
+except ImportError:
+    _orjson = None
+
 
 # ---------------------------------------------------------------------------
 # Character Role Tables
@@ -167,28 +175,140 @@ _MUNCH = {
 }
 
 
+# Onset bands, in role-table key order.  _choreograph classifies beats by
+# index into this tuple rather than by name.
+_BANDS = ("bass", "mid", "treble")
+_BASS, _MID, _TREBLE = range(len(_BANDS))
+
+
 # ---------------------------------------------------------------------------
 # Analysis helpers
 # ---------------------------------------------------------------------------
 
 
+def _as_pcm16(samples):
+    """
+    Normalise the caller's Int16 samples for _analyze_audio.
+
+    A JS Int16Array arrives in Pyodide as a JsProxy; to_py() turns it into a
+    memoryview over the same bytes.  Buffers (bytes / bytearray / memoryview)
+    are then viewed as int16 directly instead of being converted one Python
+    int at a time.  Lists and ndarrays pass through unchanged.
+    """
+    if hasattr(samples, "to_py"):           # Pyodide JsProxy
+        samples = samples.to_py()
+    if isinstance(samples, (bytes, bytearray, memoryview)):
+        if _HAS_NUMPY:
+            return _np.frombuffer(samples, dtype=_np.int16)
+        return memoryview(samples).cast("B").cast("h")
+    return samples
+
+
 def _onset_strength(energies):
-    """Positive energy flux — detects transients."""
+    """
+    Positive energy flux — detects transients.  With numpy, *energies* may
+    be a stacked (bands, n) array; the flux is taken along the last axis.
+    """
+    if _HAS_NUMPY:
+        e = _np.asarray(energies, dtype=_np.float32)
+        return _np.maximum(e[..., 1:] - e[..., :-1], 0.0)
     return [max(0.0, energies[i] - energies[i - 1]) for i in range(1, len(energies))]
 
 
-def _find_peaks(values, threshold_ratio=0.3, min_gap=4):
-    """Local maxima above threshold, separated by at least min_gap indices."""
-    if not values:
+def _band_onsets(bass_e, mid_e, treble_e):
+    """
+    (bass, mid, treble) onset-strength curves.  With numpy the three
+    equal-length energy curves go through _onset_strength as one stacked
+    (3, n) array, and the rows are returned.
+    """
+    if _HAS_NUMPY:
+        bas_on, mid_on, tre_on = _onset_strength(_np.stack((bass_e, mid_e, treble_e)))
+        return bas_on, mid_on, tre_on
+    return _onset_strength(bass_e), _onset_strength(mid_e), _onset_strength(treble_e)
+
+
+# Adaptive peak threshold: running median over ±_ADAPTIVE_HALF_WIN onset
+# chunks (±1.6 s at 50 ms chunks) plus a static floor of _ADAPTIVE_DELTA × the
+# curve's global peak.
+_ADAPTIVE_HALF_WIN = 32
+_ADAPTIVE_DELTA    = 0.10
+
+
+def _running_median(values, half_window):
+    """Median of values[i-M : i+M+1] for every i, with edge samples repeated."""
+    m = half_window
+    if _HAS_NUMPY:
+        v = _np.pad(_np.asarray(values), m, mode="edge")
+        return _np.median(_np.lib.stride_tricks.sliding_window_view(v, 2 * m + 1), axis=1)
+    v = [values[0]] * m + list(values) + [values[-1]] * m
+    window = sorted(v[:2 * m + 1])
+    out = [window[m]]
+    for i in range(2 * m + 1, len(v)):
+        # Slide by one: drop the oldest sample, insert the newest
+        del window[_bisect_left(window, v[i - 2 * m - 1])]
+        _insort(window, v[i])
+        out.append(window[m])
+    return out
+
+
+def _adaptive_threshold(values, peak_val, half_window=_ADAPTIVE_HALF_WIN,
+                        delta=_ADAPTIVE_DELTA):
+    """
+    Per-index threshold δ(n) = delta·peak + median(values[n-M .. n+M]).
+    Follows the local onset level, so quiet passages are not drowned out by
+    a single loud transient the way a global max·ratio threshold is.
+    """
+    med = _running_median(values, half_window)
+    static = delta * peak_val
+    if _HAS_NUMPY:
+        return med + static
+    return [m + static for m in med]
+
+
+def _find_peaks(values, threshold_ratio=0.3, min_gap=4, adaptive=False):
+    """
+    Local maxima above threshold, separated by at least min_gap indices.
+
+    The threshold is threshold_ratio × the curve's peak, or, with
+    *adaptive*, the per-index _adaptive_threshold (threshold_ratio is then
+    unused).  Curves shorter than the median window always use the global
+    threshold.
+    """
+    if len(values) == 0:
         return []
+    adaptive = adaptive and len(values) > 2 * _ADAPTIVE_HALF_WIN + 1
+    if _HAS_NUMPY:
+        v = _np.asarray(values)
+        peak_val = v.max()
+        if peak_val <= 0:
+            return []
+        if adaptive:
+            threshold = _adaptive_threshold(v, peak_val)[1:-1]
+        else:
+            threshold = peak_val * threshold_ratio
+        mid = v[1:-1]
+        # Candidate local maxima in one vectorised pass; only the survivors
+        # go through the (sequential) min_gap check.
+        cand = _np.flatnonzero((mid >= threshold) & (mid >= v[:-2]) & (mid >= v[2:])) + 1
+        peaks = []
+        last = -min_gap
+        for i in cand.tolist():
+            if i - last >= min_gap:
+                peaks.append(i)
+                last = i
+        return peaks
+
     peak_val = max(values)
     if peak_val <= 0:
         return []
-    threshold = peak_val * threshold_ratio
+    if adaptive:
+        thresholds = _adaptive_threshold(values, peak_val)
+    else:
+        thresholds = [peak_val * threshold_ratio] * len(values)
     peaks = []
     last = -min_gap
     for i in range(1, len(values) - 1):
-        if (values[i] >= threshold
+        if (values[i] >= thresholds[i]
                 and values[i] >= values[i - 1]
                 and values[i] >= values[i + 1]
                 and i - last >= min_gap):
@@ -197,6 +317,51 @@ def _find_peaks(values, threshold_ratio=0.3, min_gap=4):
     return peaks
 
 
+def _find_beats_dp(novelty, bpm_hint, chunk_dur_s, min_gap=2, tightness=100.0):
+    """
+    Dynamic-programming beat tracker (Ellis 2007, as used by librosa).
+
+    Picks the beat sequence maximising
+        sum(novelty[b_i]) - tightness * sum(log(Δ_i / period) ** 2)
+    where period is the beat spacing implied by *bpm_hint*, so beats land
+    on strong onsets *and* keep a steady pulse — unlike _find_peaks, which
+    takes every strong peak greedily.  Predecessors are searched only in
+    [t - 2·period, t - max(min_gap, period/2)], so the cost is linear in
+    len(novelty).  Returns ascending indices into *novelty*.
+    """
+    v = novelty.tolist() if hasattr(novelty, "tolist") else list(novelty)
+    n = len(v)
+    if n == 0 or bpm_hint <= 0 or max(v) <= 0:
+        return []
+
+    period = 60.0 / bpm_hint / chunk_dur_s          # beat spacing in chunks
+    d_min  = max(1, min_gap, int(round(period / 2)))
+    d_max  = max(d_min, int(round(2 * period)))
+    # Transition penalty depends only on the spacing, so tabulate it once
+    penalty = {d: tightness * math.log(d / period) ** 2 for d in range(d_min, d_max + 1)}
+
+    scale = 1.0 / max(v)
+    score = [0.0] * n
+    back  = [-1] * n
+    for t in range(n):
+        best, best_p = 0.0, -1
+        for d in range(d_min, min(d_max, t) + 1):
+            c = score[t - d] - penalty[d]
+            if c > best:
+                best, best_p = c, t - d
+        score[t] = v[t] * scale + best
+        back[t]  = best_p
+
+    # The last beat is the best-scoring chunk within one period of the end
+    t = max(range(max(0, n - d_max), n), key=score.__getitem__)
+    beats = []
+    while t >= 0:
+        beats.append(t)
+        t = back[t]
+    beats.reverse()
+    return beats
+
+
 def _estimate_bpm(times_s, min_bpm=60, max_bpm=210):
     if len(times_s) < 4:
         return 120
@@ -211,15 +376,70 @@ def _estimate_bpm(times_s, min_bpm=60, max_bpm=210):
     return max(min_bpm, min(max_bpm, round(60.0 / median)))
 
 
-def _cyclic(lst, idx):
-    return lst[idx % len(lst)] if lst else None
+def _near_any(times_s, ref_s, tol_s):
+    """
+    For each time in *times_s*, True if any time in *ref_s* lies strictly
+    within *tol_s* of it.  Only the two sorted neighbours of each time are
+    compared, so the cost is O(log len(ref_s)) per query.
+    """
+    refs = sorted(set(ref_s))
+    if not refs:
+        return [False] * len(times_s)
+    if _HAS_NUMPY:
+        r = _np.asarray(refs, dtype=_np.float64)
+        t = _np.asarray(times_s, dtype=_np.float64)
+        j = _np.searchsorted(r, t)
+        left  = r[_np.maximum(j - 1, 0)]
+        right = r[_np.minimum(j, len(r) - 1)]
+        return ((_np.abs(t - left) < tol_s) | (_np.abs(right - t) < tol_s)).tolist()
+    near = []
+    for t in times_s:
+        j = _bisect_left(refs, t)
+        near.append(any(abs(t - refs[k]) < tol_s for k in (j - 1, j) if 0 <= k < len(refs)))
+    return near
+
+
+def _movement_names(char_table):
+    """Distinct movement names used by a role table, in first-use order."""
+    names = {}
+    for cfg in char_table.values():
+        for key in _BANDS + ("soft",):
+            for mov in cfg.get(key, []):
+                names.setdefault(mov, len(names))
+    return tuple(names)
+
+
+def _cue(cues, movement, frame_on, hold_frames):
+    """
+    Append the ON and OFF cue for one movement activation to *cues*, a
+    (frames, movements, states) triple of parallel lists.  *movement* is an
+    index into the table's movement names.
+    """
+    frames, movements, states = cues
+    frames.extend((frame_on, frame_on + hold_frames))
+    movements.extend((movement, movement))
+    states.extend((True, False))
 
 
-def _cue(movement, frame_on, hold_frames):
-    """Return [ON cue, OFF cue] for one movement activation."""
+def _signals_from_cues(cues, mov_names):
+    """
+    Materialise a (frames, movements, states) cue triple as the v3.0
+    signals list: sorted by frame, ON before OFF within the same frame,
+    otherwise in insertion order.  Movement indices are mapped back to
+    names through *mov_names*.
+    """
+    frames, movements, states = cues
+    # One integer key, frame*2 + (state is OFF), sorted stably — equivalent
+    # to a lexsort on (frame, not state) without per-element tuples.
+    if _HAS_NUMPY:
+        key   = _np.asarray(frames, dtype=_np.int64) * 2 + _np.logical_not(states)
+        order = _np.argsort(key, kind="stable").tolist()
+    else:
+        key   = [f * 2 + (not st) for f, st in zip(frames, states)]
+        order = sorted(range(len(frames)), key=key.__getitem__)
     return [
-        {"frame": frame_on,               "movement": movement, "state": True,  "note": ""},
-        {"frame": frame_on + hold_frames, "movement": movement, "state": False, "note": ""},
+        {"frame": frames[i], "movement": mov_names[movements[i]], "state": states[i], "note": ""}
+        for i in order
     ]
 
 
@@ -229,8 +449,9 @@ def _cue(movement, frame_on, hold_frames):
 
 def _analyze_audio(samples, sr):
     """
-    Returns (bass_e, mid_e, treble_e, chunk_dur_s) where each energy list
-    has one entry per 50 ms chunk.  Uses numpy when available.
+    Returns (bass_e, mid_e, treble_e, chunk_dur_s) where each energy curve
+    has one entry per 50 ms chunk.  Uses numpy when available (curves are
+    float32 ndarrays); the pure-Python fallback returns plain lists.
     """
     chunk = max(256, int(sr * 0.050))  # 50 ms chunks
 
@@ -241,10 +462,17 @@ def _analyze_audio(samples, sr):
     w_fast = max(1, sr // 2000)  # treble gate (~2 kHz)
 
     if _HAS_NUMPY:
-        x = _np.asarray(samples, dtype=_np.float32) / 32768.0
+        x = _np.asarray(samples, dtype=_np.float32) * (1.0 / 32768.0)
         absx = _np.abs(x)
         n = len(absx)
-        cs = _np.concatenate([[0.0], _np.cumsum(absx).astype(_np.float64)])
+        # Running sum stays float32: the accumulation is float32 either way,
+        # so a float64 copy only doubled the bytes moved by _smooth.
+        # One cumsum serves both windows; a direct np.convolve per window
+        # costs O(w) per sample and measured slower from w ≈ 8 upwards
+        # (w_fast = 11, w_slow = 147 at 22.05 kHz), so the prefix-sum stays.
+        cs = _np.empty(n + 1, dtype=_np.float32)
+        cs[0] = 0.0
+        _np.cumsum(absx, dtype=_np.float32, out=cs[1:])
 
         def _smooth(w):
             # cs has shape (n+1,).
@@ -255,42 +483,40 @@ def _analyze_audio(samples, sr):
             r[w - 1:] = (cs[w:] - cs[:n - w + 1]) / w
             if w > 1:
                 # Partial window at the very start
-                r[:w - 1] = cs[1:w] / _np.arange(1, w, dtype=_np.float64)
+                r[:w - 1] = cs[1:w] / _np.arange(1, w, dtype=_np.float32)
             return r
 
         lp_slow = _smooth(w_slow)  # bass envelope
         lp_fast = _smooth(w_fast)  # mid+treble envelope
 
-        bass_sig   = lp_slow
-        mid_sig    = _np.clip(lp_fast - lp_slow, 0, None)
-        treble_sig = _np.clip(absx  - lp_fast,  0, None)
+        n_chunks = max(0, (n - chunk) // chunk)
+        n_used   = n_chunks * chunk
 
-        n_chunks = (n - chunk) // chunk
+        # Chunk-aligned (n_chunks, chunk) views — the band split and the
+        # per-chunk mean run on these directly, so no full-length mid/treble
+        # signals are ever materialised.
+        slow_r = lp_slow[:n_used].reshape(n_chunks, chunk)
+        fast_r = lp_fast[:n_used].reshape(n_chunks, chunk)
+        abs_r  = absx[:n_used].reshape(n_chunks, chunk)
 
-        def _crms(sig):
-            out = []
-            for i in range(n_chunks):
-                seg = sig[i * chunk:(i + 1) * chunk]
-                out.append(float(_np.mean(seg) + 1e-10))
-            return out
+        bass_e   = slow_r.mean(axis=1) + 1e-10
+        mid_e    = _np.maximum(fast_r - slow_r, 0.0).mean(axis=1) + 1e-10
+        treble_e = _np.maximum(abs_r - fast_r, 0.0).mean(axis=1) + 1e-10
 
-        return _crms(bass_sig), _crms(mid_sig), _crms(treble_sig), chunk / sr
+        return bass_e, mid_e, treble_e, chunk / sr
 
     else:
-        # Pure-Python fallback (slow, but correct)
-        norm = [s / 32768.0 for s in samples]
-        absx = [abs(v) for v in norm]
+        # Pure-Python fallback (slow, but correct).  Loops are kept to
+        # slices, zip() and builtin sum() so the per-sample work stays in C.
+        absx = [abs(s) / 32768.0 for s in samples]
         n = len(absx)
-        cs = [0.0] * (n + 1)
-        for i, v in enumerate(absx):
-            cs[i + 1] = cs[i] + v
+        cs = list(_accumulate(absx, initial=0.0))
 
         def _smooth(w):
             w = max(1, w)
-            r = []
-            for i in range(n):
-                lo = max(0, i - w + 1)
-                r.append((cs[i + 1] - cs[lo]) / (i - lo + 1))
+            # Partial windows at the very start (cs[0] == 0), then full ones
+            r = [cs[i + 1] / (i + 1) for i in range(min(w - 1, n))]
+            r.extend((hi - lo) / w for hi, lo in zip(cs[w:], cs))
             return r
 
         lp_slow = _smooth(w_slow)
@@ -301,9 +527,11 @@ def _analyze_audio(samples, sr):
         for i in range(n_chunks):
             s = i * chunk
             e = s + chunk
-            bass_e.append(   sum(lp_slow[j]                          for j in range(s, e)) / chunk + 1e-10)
-            mid_e.append(    sum(max(0.0, lp_fast[j] - lp_slow[j])  for j in range(s, e)) / chunk + 1e-10)
-            treble_e.append( sum(max(0.0, absx[j]    - lp_fast[j])  for j in range(s, e)) / chunk + 1e-10)
+            slow = lp_slow[s:e]
+            fast = lp_fast[s:e]
+            bass_e.append(   sum(slow) / chunk + 1e-10)
+            mid_e.append(    sum(f - l for f, l in zip(fast, slow) if f > l) / chunk + 1e-10)
+            treble_e.append( sum(a - f for a, f in zip(absx[s:e], fast) if a > f) / chunk + 1e-10)
 
         return bass_e, mid_e, treble_e, chunk / sr
 
@@ -312,111 +540,168 @@ def _analyze_audio(samples, sr):
 # Choreography engine
 # ---------------------------------------------------------------------------
 
-def _choreograph(bass_e, mid_e, treble_e, chunk_dur_s, duration_ms,
+def _choreograph(bas_on, mid_on, tre_on, chunk_dur_s, duration_ms,
                  band, bpm, beat_idx, bass_idx, treble_idx):
     """
     Map onset lists to character movements and return the characters dict
-    suitable for .cybershow.json v3.0.
+    suitable for .cybershow.json v3.0.  bas_on / mid_on / tre_on are the
+    band onset-strength curves from _band_onsets().
     """
     FPS = 50
     MS_PER_FRAME = 1000.0 / FPS
 
-    n_on = min(len(bass_e), len(mid_e), len(treble_e)) - 1  # onset arrays are 1 shorter
-
     def to_s(idx_list):
         return [(i + 1) * chunk_dur_s for i in idx_list]
 
     beat_times_s   = to_s(beat_idx)
     treble_times_s = to_s(treble_idx)
 
-    def to_frame(t_s):
-        return max(0, int(t_s * 1000.0 / MS_PER_FRAME))
+    def to_frames(times_s):
+        """
+        Frame numbers for the cues that start within the song — the list is
+        cut at the first time past duration_ms (times are ascending).
+        """
+        if _HAS_NUMPY:
+            t_ms = _np.asarray(times_s, dtype=_np.float64) * 1000.0
+            late = t_ms > duration_ms
+            n_in = int(late.argmax()) if late.any() else len(t_ms)
+            return _np.maximum(0, (t_ms[:n_in] / MS_PER_FRAME).astype(_np.int64)).tolist()
+        frames = []
+        for t_s in times_s:
+            if t_s * 1000.0 > duration_ms:
+                break
+            frames.append(max(0, int(t_s * 1000.0 / MS_PER_FRAME)))
+        return frames
+
+    beat_frames   = to_frames(beat_times_s)
+    treble_frames = to_frames(treble_times_s)
 
     char_table = _ROCK if band == "rock" else _MUNCH
 
-    # Onset strength lists (one shorter than energy lists)
-    bas_on = [max(0.0, bass_e[i] - bass_e[i - 1]) for i in range(1, len(bass_e))]
-    mid_on = [max(0.0, mid_e[i]  - mid_e[i - 1])  for i in range(1, len(mid_e))]
-    tre_on = [max(0.0, treble_e[i] - treble_e[i - 1]) for i in range(1, len(treble_e))]
+    # Cues carry small ints; names are looked up only when signals are built
+    mov_names = _movement_names(char_table)
+    mov_id    = {name: i for i, name in enumerate(mov_names)}
+
+    n_on = min(len(bas_on), len(mid_on), len(tre_on))
 
     def classify(chunk_i):
-        """Dominant band for a given onset chunk index."""
+        """Dominant band (index into _BANDS) for a given onset chunk index."""
         b = bas_on[chunk_i] if chunk_i < len(bas_on) else 0.0
         m = mid_on[chunk_i] if chunk_i < len(mid_on) else 0.0
         t = tre_on[chunk_i] if chunk_i < len(tre_on) else 0.0
         if b >= m and b >= t:
-            return "bass"
+            return _BASS
         if t >= m:
-            return "treble"
-        return "mid"
+            return _TREBLE
+        return _MID
 
-    # Pair each beat with its class
-    beat_classes = [
-        (idx, classify(min(idx, n_on - 1)))
-        for idx in beat_idx
-    ]
+    # Dominant band of each beat
+    beat_classes = [classify(min(idx, n_on - 1)) for idx in beat_idx]
 
-    beat_set_s = set(beat_times_s)  # for "near a beat" test
+    # "Near a beat" flag per treble cue — shared by every character
+    treble_near_beat = _near_any(treble_times_s, beat_times_s, 0.12)
 
     characters_out = {}
 
     for char_name, cfg in char_table.items():
-        signals = []
-        counters = {"bass": 0, "mid": 0, "treble": 0, "soft": 0}
+        cues = ([], [], [])   # frames, movements, states
 
-        # --- Main beat-driven cues ---
-        for chunk_i, band_class in beat_classes:
-            t_s = (chunk_i + 1) * chunk_dur_s
-            if t_s * 1000.0 > duration_ms:
-                break
+        # Role-table entries resolved once per character, indexed by band
+        movlists = tuple(tuple(mov_id[m] for m in cfg.get(b, [])) for b in _BANDS)
+        holds    = tuple(cfg.get(f"hold_{b}", 3) for b in _BANDS)
+        n_movs   = tuple(len(m) for m in movlists)
+        counters = [0] * len(_BANDS)
+        # Bit i set ⇔ this character has movements for _BANDS[i]
+        active   = sum(1 << i for i, n in enumerate(n_movs) if n)
 
-            movlist = cfg.get(band_class, [])
-            hold    = cfg.get(f"hold_{band_class}", 3)
-
-            if movlist:
-                mov = _cyclic(movlist, counters[band_class])
-                if mov:
-                    signals.extend(_cue(mov, to_frame(t_s), hold))
-                    counters[band_class] += 1
+        # --- Main beat-driven cues ---
+        if active:
+            for frame, band_class in zip(beat_frames, beat_classes):
+                if not active >> band_class & 1:
+                    continue
+                # Cycle through the band's movement list
+                c = counters[band_class]
+                _cue(cues, movlists[band_class][c % n_movs[band_class]],
+                     frame, holds[band_class])
+                counters[band_class] = c + 1
 
         # --- Soft / idle movements for vocalists on treble-only onsets ---
         role      = cfg.get("role", "")
-        soft_list = cfg.get("soft", [])
+        soft_list = [mov_id[m] for m in cfg.get("soft", [])]
         if role in ("lead_vocalist", "vocalist", "lead") and soft_list:
             hold_soft = cfg.get("hold_soft", 2)
-            for vi, t_s in enumerate(treble_times_s):
-                if t_s * 1000.0 > duration_ms:
-                    break
+            n_soft    = len(soft_list)
+            soft_i    = 0
+            for vi, frame in enumerate(treble_frames):
                 # Skip if too close to a beat (avoid double-firing)
-                near_beat = any(abs(t_s - bt) < 0.12 for bt in beat_set_s)
-                if not near_beat:
-                    mov = _cyclic(soft_list, counters["soft"])
-                    if mov:
-                        signals.extend(_cue(mov, to_frame(t_s), hold_soft))
-                        counters["soft"] += 1
+                if not treble_near_beat[vi]:
+                    _cue(cues, soft_list[soft_i % n_soft], frame, hold_soft)
+                    soft_i += 1
 
-        # Sort by frame, ON before OFF within the same frame
-        signals.sort(key=lambda x: (x["frame"], not x["state"]))
-
-        if signals:
-            characters_out[char_name] = {"signals": signals}
+        if cues[0]:
+            characters_out[char_name] = {"signals": _signals_from_cues(cues, mov_names)}
 
     return characters_out
 
 
+# ---------------------------------------------------------------------------
+# JSON output
+# ---------------------------------------------------------------------------
+
+# One cue, laid out exactly as json.dumps() would write it.  Movement names
+# come from the role tables above and never need escaping; note is always "".
+_SIGNAL_FMT = '{"frame": %d, "movement": "%s", "state": %s, "note": ""}'
+
+
+def _dumps(obj):
+    """json.dumps(), via orjson when it is installed."""
+    if _orjson is not None:
+        return _orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _show_json(result):
+    """
+    Serialise a show dict built by analyze_and_choreograph().
+
+    Without orjson, the signal lists — nearly all of the payload — are
+    written with one format operation per cue instead of going through
+    json.dumps()'s per-dict encoder; the remaining fields still use
+    json.dumps() so titles are escaped correctly.
+    """
+    if _orjson is not None:
+        return _orjson.dumps(result).decode("utf-8")
+
+    header = {k: v for k, v in result.items() if k != "characters"}
+    chars = ", ".join(
+        "%s: {\"signals\": [%s]}" % (
+            json.dumps(name),
+            ", ".join(
+                _SIGNAL_FMT % (s["frame"], s["movement"], "true" if s["state"] else "false")
+                for s in entry["signals"]
+            ),
+        )
+        for name, entry in result["characters"].items()
+    )
+    return json.dumps(header)[:-1] + ', "characters": {' + chars + "}}"
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms):
+def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms,
+                            beat_picker="greedy", adaptive_threshold=False):
     """
     Full show-generation pipeline.
 
     Parameters
     ----------
-    samples_list : list[int]
+    samples_list : list[int] | Int16Array | buffer
         Mono Int16 PCM samples.  Should be downsampled to ~11 025 Hz by the
         caller (JS) before being passed here to keep processing fast.
+        Passing the Int16Array itself (or any int16 buffer) avoids a
+        per-sample conversion — see _as_pcm16().
     sample_rate  : int
         Sample rate of *samples_list* (not the original audio).
     band         : str
@@ -426,6 +711,14 @@ def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms)
     duration_ms  : int | float
         Original audio duration in milliseconds.  Used for frame-count
         calculation and to cap event generation at the end of the song.
+    beat_picker  : str
+        "greedy" (default) — strongest onset peaks, see _find_peaks.
+        "dp" — tempo-consistent beats from _find_beats_dp, seeded with the
+        BPM estimated from the greedy peaks.  Falls back to the greedy
+        beats when there are too few of them to estimate a tempo.
+    adaptive_threshold : bool
+        Pick onset peaks against a running-median threshold instead of a
+        fraction of the song's loudest onset (see _adaptive_threshold).
 
     Returns
     -------
@@ -436,7 +729,7 @@ def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms)
     sr = int(sample_rate)
 
     # -- Frequency-band energy per 50 ms chunk ----------------------------
-    bass_e, mid_e, treble_e, chunk_dur_s = _analyze_audio(samples_list, sr)
+    bass_e, mid_e, treble_e, chunk_dur_s = _analyze_audio(_as_pcm16(samples_list), sr)
 
     n_e = min(len(bass_e), len(mid_e), len(treble_e))
     bass_e   = bass_e[:n_e]
@@ -444,33 +737,40 @@ def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms)
     treble_e = treble_e[:n_e]
 
     # -- Onset-strength curves (1 shorter) --------------------------------
-    bas_on = _onset_strength(bass_e)
-    mid_on = _onset_strength(mid_e)
-    tre_on = _onset_strength(treble_e)
+    bas_on, mid_on, tre_on = _band_onsets(bass_e, mid_e, treble_e)
     n_on   = min(len(bas_on), len(mid_on), len(tre_on))
 
-    combined = [
-        bas_on[i] + 0.6 * mid_on[i] + 0.3 * tre_on[i]
-        for i in range(n_on)
-    ]
+    if _HAS_NUMPY:
+        combined = bas_on[:n_on] + 0.6 * mid_on[:n_on] + 0.3 * tre_on[:n_on]
+    else:
+        combined = [
+            bas_on[i] + 0.6 * mid_on[i] + 0.3 * tre_on[i]
+            for i in range(n_on)
+        ]
 
     # -- Peak-picking (minimum gap = 150 ms expressed in chunks) ----------
     min_gap_beat   = max(2, int(0.150 / chunk_dur_s))
     min_gap_treble = max(2, int(0.080 / chunk_dur_s))
 
-    beat_idx   = _find_peaks(combined,  0.25, min_gap_beat)
-    bass_idx   = _find_peaks(bas_on,    0.30, min_gap_beat)
-    treble_idx = _find_peaks(tre_on,    0.25, min_gap_treble)
+    beat_idx   = _find_peaks(combined,  0.25, min_gap_beat,   adaptive_threshold)
+    bass_idx   = _find_peaks(bas_on,    0.30, min_gap_beat,   adaptive_threshold)
+    treble_idx = _find_peaks(tre_on,    0.25, min_gap_treble, adaptive_threshold)
 
     beat_times_s = [(i + 1) * chunk_dur_s for i in beat_idx]
     bpm = _estimate_bpm(beat_times_s)
 
+    if beat_picker == "dp" and len(beat_times_s) >= 4:
+        beat_idx     = _find_beats_dp(combined, bpm, chunk_dur_s, min_gap_beat)
+        beat_times_s = [(i + 1) * chunk_dur_s for i in beat_idx]
+    elif beat_picker not in ("greedy", "dp"):
+        raise ValueError(f"beat_picker must be 'greedy' or 'dp', got {beat_picker!r}")
+
     # -- Build choreography -----------------------------------------------
     FPS = 50
     duration_frames = int(duration_ms / (1000.0 / FPS))
 
     characters_out = _choreograph(
-        bass_e, mid_e, treble_e, chunk_dur_s, duration_ms,
+        bas_on, mid_on, tre_on, chunk_dur_s, duration_ms,
         band, bpm, beat_idx, bass_idx, treble_idx,
     )
 
@@ -493,21 +793,23 @@ def analyze_and_choreograph(samples_list, sample_rate, band, title, duration_ms)
         ),
         "characters": characters_out,
     }
-    return json.dumps(result)
+    return _show_json(result)
 
 
-def analyze_and_choreograph_json(samples_list, sample_rate, band, title, duration_ms):
+def analyze_and_choreograph_json(samples_list, sample_rate, band, title, duration_ms,
+                                 beat_picker="greedy", adaptive_threshold=False):
     """
     Safe Pyodide entry point — always returns a JSON string.
     On error returns {"error": "<message>", "traceback": "..."}.
     """
     try:
         return analyze_and_choreograph(
-            samples_list, sample_rate, band, title, duration_ms
+            samples_list, sample_rate, band, title, duration_ms,
+            beat_picker, adaptive_threshold,
         )
     except Exception as _exc:
         import traceback as _tb
-        return json.dumps({
+        return _dumps({
             "error":     str(_exc),
             "traceback": _tb.format_exc(),
         })
@@ -26,12 +26,52 @@
 #   (At 96kHz resample: 9→20, 4→9, 5→10 — which matches KWS observations)
 
 import struct
+import sys
+from array import array
 from SCME.SMM.constants import (
     BMC_HIGH, BMC_LOW,
     BMC_HALF_A, BMC_HALF_B,
     SAMPLES_PER_BIT,
+    TD_FRAME_BITS, BD_FRAME_BITS,
 )
 
+try:
+    import numpy as _np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+
+# The only four 9-sample outputs BMC can produce, indexed
+# [level before the bit][bit] with level 0 = LOW, 1 = HIGH.
+_PATTERNS = tuple(
+    (
+        array("h", [after]) * SAMPLES_PER_BIT,                                  # '0'
+        array("h", [after]) * BMC_HALF_A + array("h", [before]) * BMC_HALF_B,  # '1'
+    )
+    for before, after in ((BMC_LOW, BMC_HIGH), (BMC_HIGH, BMC_LOW))
+)
+
+# Bits of every byte value, indexed [msb_first][byte].
+_BYTE_BITS = (
+    tuple(tuple((v >> i) & 1 for i in range(8)) for v in range(256)),
+    tuple(tuple((v >> i) & 1 for i in range(7, -1, -1)) for v in range(256)),
+)
+
+# Below this many bits (a single 94/96-bit frame, say) the pattern loop beats
+# numpy's fixed per-call overhead.
+_NUMPY_MIN_BITS = 256
+
+if _HAS_NUMPY:
+    _PATTERN_TABLE = _np.array(_PATTERNS, dtype=_np.int16)   # shape (2, 2, 9)
+
+# Precompiled packers for whole TD / BD frames (846 / 864 samples), keyed by
+# sample count, so to_raw_bytes() on a frame-sized list skips the format parse.
+_FRAME_STRUCTS = {
+    n * SAMPLES_PER_BIT: struct.Struct(f"<{n * SAMPLES_PER_BIT}h")
+    for n in (TD_FRAME_BITS, BD_FRAME_BITS)
+}
+
 
 class BMCEncoder:
     """
@@ -54,6 +94,11 @@ class BMCEncoder:
         """Reset encoder state (use only between independent streams)."""
         self._level = level
 
+    @property
+    def level(self) -> int:
+        """Current output level (the level the next bit starts from)."""
+        return self._level
+
     # ── Core encoder ────────────────────────────────────────────────────────
 
     def encode_bit(self, bit: int) -> list[int]:
@@ -80,22 +125,48 @@ class BMCEncoder:
             # '0': no mid-period transition — full period at new level
             return [self._level] * SAMPLES_PER_BIT
 
-    def encode_bits(self, bits: list[int]) -> list[int]:
+    def encode_bits(self, bits: list[int]) -> array:
         """
         Encode multiple bits (MSB-first) into PCM sample values.
 
+        Each bit is a lookup into _PATTERNS.  For long inputs with numpy,
+        the level before every bit is derived in one pass — each bit flips
+        the level once at its start and once more mid-period if it is a '1',
+        so the level before bit i is the parity of sum(bit[j] + 1, j < i) —
+        and the waveform is a single gather from _PATTERN_TABLE.
+
         Args:
-            bits: Iterable of 0/1 values (MSB first per RAE convention).
+            bits: Sequence of 0/1 values (MSB first per RAE convention).
 
         Returns:
-            Flat list of int16 sample values.
+            array('h') of len(bits) * SAMPLES_PER_BIT int16 sample values.
         """
-        samples = []
-        for bit in bits:
-            samples.extend(self.encode_bit(bit))
-        return samples
-
-    def encode_byte(self, byte: int, msb_first: bool = True) -> list[int]:
+        start = 0 if self._level == BMC_LOW else 1
+
+        if _HAS_NUMPY and len(bits) >= _NUMPY_MIN_BITS:
+            b      = (_np.asarray(bits) != 0).astype(_np.int8)
+            flips  = _np.cumsum(b + 1, dtype=_np.int64)
+            before = (flips - (b + 1) + start) & 1       # level before each bit
+            out    = array("h")
+            out.frombytes(_PATTERN_TABLE[before, b].tobytes())
+            end = (int(flips[-1]) + start) & 1
+        else:
+            out = array("h", bytes(2 * SAMPLES_PER_BIT * len(bits)))
+            level = start
+            pos   = 0
+            for bit in bits:
+                if bit:
+                    out[pos:pos + SAMPLES_PER_BIT] = _PATTERNS[level][1]
+                else:
+                    out[pos:pos + SAMPLES_PER_BIT] = _PATTERNS[level][0]
+                    level ^= 1          # '0' ends on the opposite level
+                pos += SAMPLES_PER_BIT
+            end = level
+
+        self._level = BMC_HIGH if end else BMC_LOW
+        return out
+
+    def encode_byte(self, byte: int, msb_first: bool = True) -> array:
         """
         Encode a single byte (8 bits) into PCM sample values.
 
@@ -104,17 +175,36 @@ class BMCEncoder:
             msb_first: If True, bit 7 is encoded first (RAE convention).
 
         Returns:
-            List of 8 * SAMPLES_PER_BIT = 72 sample values.
+            array('h') of 8 * SAMPLES_PER_BIT = 72 sample values.
+        """
+        return self.encode_bits(_BYTE_BITS[msb_first][byte])
+
+    def encode_bytes(self, data: bytes, msb_first: bool = True) -> array:
+        """
+        Encode a byte string into PCM sample values, phase-continuous with
+        previous calls.  Bits are extracted for the whole buffer at once
+        (np.unpackbits when numpy is available).
+
+        Args:
+            data:      bytes / bytearray / memoryview.
+            msb_first: If True, bit 7 of each byte is encoded first.
+
+        Returns:
+            array('h') of len(data) * 8 * SAMPLES_PER_BIT sample values.
         """
-        if msb_first:
-            bits = [(byte >> i) & 1 for i in range(7, -1, -1)]
+        if _HAS_NUMPY and len(data) * 8 >= _NUMPY_MIN_BITS:
+            bits = _np.unpackbits(
+                _np.frombuffer(data, dtype=_np.uint8),
+                bitorder="big" if msb_first else "little",
+            )
         else:
-            bits = [(byte >> i) & 1 for i in range(8)]
+            table = _BYTE_BITS[msb_first]
+            bits  = [bit for byte in bytes(data) for bit in table[byte]]
         return self.encode_bits(bits)
 
     # ── Frame encoding ───────────────────────────────────────────────────────
 
-    def encode_frame(self, frame_bits: list[int]) -> list[int]:
+    def encode_frame(self, frame_bits: list[int]) -> array:
         """
         Encode an entire RAE frame (up to 96 bits) into PCM samples.
         Phase-continuous with previous call.
@@ -124,28 +214,38 @@ class BMCEncoder:
                         (TD_FRAME_BITS=94 or BD_FRAME_BITS=96).
 
         Returns:
-            List of len(frame_bits) * SAMPLES_PER_BIT sample values.
+            array('h') of len(frame_bits) * SAMPLES_PER_BIT sample values.
         """
         return self.encode_bits(frame_bits)
 
     # ── Output helpers ───────────────────────────────────────────────────────
 
     @staticmethod
-    def to_raw_bytes(samples: list[int]) -> bytes:
+    def to_raw_bytes(samples) -> bytes:
         """
-        Pack a list of int16 sample values into raw little-endian bytes
-        suitable for writing directly into a WAV data chunk.
+        Pack int16 sample values into raw little-endian bytes suitable for
+        writing directly into a WAV data chunk.
 
         Args:
-            samples: List of integer values in range [-32768, 32767].
+            samples: array('h') from encode_bits(), or a list of integer
+                     values in range [-32768, 32767].
 
         Returns:
             bytes object (2 bytes per sample, little-endian signed 16-bit).
         """
+        if isinstance(samples, array) and samples.typecode == "h":
+            if sys.byteorder == "little":
+                return samples.tobytes()
+            swapped = array("h", samples)
+            swapped.byteswap()
+            return swapped.tobytes()
+        packer = _FRAME_STRUCTS.get(len(samples))
+        if packer is not None:
+            return packer.pack(*samples)
         return struct.pack(f"<{len(samples)}h", *samples)
 
     @staticmethod
-    def samples_to_numpy(samples: list[int]):
+    def samples_to_numpy(samples):
         """
         Convert sample list to a numpy int16 array (for downstream processing).
         Requires numpy — available in both Pyodide and desktop Python.
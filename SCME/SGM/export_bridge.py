@@ -4,7 +4,8 @@
 #
 # Self-contained: no external imports from SCME.  All constants, BMC encoding,
 # and frame-building logic are inlined so this file can be fetched and run
-# directly inside Pyodide (py.runPython(source)).
+# directly inside Pyodide (py.runPython(source)).  numpy is used for frame
+# encoding when it is loaded; otherwise everything runs on the stdlib.
 #
 # Entry points (available as Pyodide globals after runPython):
 #
@@ -14,15 +15,32 @@
 #       returns        : JSON string {td_b64, bd_b64, sample_rate, n_samples}
 #                        td_b64 / bd_b64 are base64-encoded raw Int16 LE PCM
 #
+#   render_4ch_pcm_bytes(sequences, duration_ms) -> dict
+#       Same render without base64: td_pcm / bd_pcm are byte memoryviews of
+#       the raw Int16 LE PCM, for callers that can take a buffer directly
+#       (e.g. via PyProxy.getBuffer() → Uint8Array / Int16Array in JS).
+#
 # The JavaScript caller:
 #   1. Decodes td_b64 / bd_b64 → Float32 (÷32768)
 #   2. Optionally resamples / appends music channel data from AudioBuffer
 #   3. Assembles a 4-channel WAV [MusicL, MusicR, TD, BD] via encodeMultiChWAV()
 # =============================================================================
 
-import base64
+import functools
 import json
-import struct
+import sys
+from array import array
+
+try:
+    import numpy as _np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+try:
+    import pybase64 as _b64     # optional SIMD base64 (not in Pyodide)
+except ImportError:
+    import base64 as _b64
 
 # ---------------------------------------------------------------------------
 # Inlined hardware constants  (source: SCME/SMM/constants.py, KWS-confirmed)
@@ -39,6 +57,9 @@ _TD_BITS       = 94       # bits per TD frame
 _BD_BITS       = 96       # bits per BD frame
 _TD_BLANK      = {56, 65, 70}   # 1-based bit numbers — must stay 0
 _BD_BLANK      = {45}           # 1-based
+# Same blanks as frame bitmasks (bit i ⇔ 1-based bit i+1)
+_TD_BLANK_MASK = sum(1 << (b - 1) for b in _TD_BLANK)
+_BD_BLANK_MASK = sum(1 << (b - 1) for b in _BD_BLANK)
 
 # TD channel map  (name → 1-based bit number, from RAE_Bit_Chart_2.pdf)
 _TD_CH = {
@@ -136,9 +157,17 @@ _BD_CH = {
     "spot_guitar": 96,
 }
 
-# Reverse maps: 1-based bit number → channel name
-_TD_BIT = {v: k for k, v in _TD_CH.items()}
-_BD_BIT = {v: k for k, v in _BD_CH.items()}
+# Reverse maps: tuples indexed by 1-based bit number → channel name
+# (None for index 0 and blank bits)
+def _bit_names(ch_map, n_bits):
+    names = [None] * (n_bits + 1)
+    for name, bit in ch_map.items():
+        names[bit] = name
+    return tuple(names)
+
+
+_TD_BIT = _bit_names(_TD_CH, _TD_BITS)
+_BD_BIT = _bit_names(_BD_CH, _BD_BITS)
 
 
 # ---------------------------------------------------------------------------
@@ -324,45 +353,127 @@ _CHAR_MOV_BITS = {
     }),
 }
 
-# Build flat lookup: (char_name, movement_name) → (track, channel_key_string)
-_CHAR_CHANNEL = {}
-for _cn, (_tk, _movs) in _CHAR_MOV_BITS.items():
-    _rev = _TD_BIT if _tk == "TD" else _BD_BIT
-    for _mv, _bit0 in _movs.items():
-        _ch_name = _rev.get(_bit0 + 1)    # _bit0 is 0-based; dict is 1-based
-        if _ch_name:
-            _CHAR_CHANNEL[(_cn, _mv)] = (_tk, _ch_name)
+_TRACKS = ("TD", "BD")
+
+
+@functools.lru_cache(maxsize=None)
+def _char_channel(char_name, mov_name):
+    """
+    (character, movement) → (track index into _TRACKS, 0-based bit), or None
+    if the pair has no channel.  Resolved on first use and memoised, so only
+    the pairs a show actually uses are ever built.  Only bits that carry a
+    named channel are mapped, so blank bits can never be reached from here.
+    """
+    entry = _CHAR_MOV_BITS.get(char_name)
+    if entry is None:
+        return None
+    track, movs = entry
+    bit0 = movs.get(mov_name)
+    if bit0 is None:
+        return None
+    rev = _TD_BIT if track == "TD" else _BD_BIT
+    # bit0 is 0-based; rev is 1-based.  Skip bits beyond the track's frame
+    if bit0 + 1 < len(rev) and rev[bit0 + 1] is not None:
+        return _TRACKS.index(track), bit0
+    return None
 
 
 # ---------------------------------------------------------------------------
 # Inlined BMC encoder
 # ---------------------------------------------------------------------------
 
+# Line level by parity: 0 → _LOW, 1 → _HIGH.  The encoder tracks parity and
+# flips it with ^= 1.
+_LEVELS = (_LOW, _HIGH)
+
+if _HAS_NUMPY:
+    _HALF_LEVELS = _np.array(_LEVELS, dtype=_np.int16)
+
+
+def _encode_frame_np(frame_bits, start_parity):
+    """
+    Vectorised BMC encode of one frame.
+
+    Each bit is two half-periods (HALF_A + HALF_B samples).  The level flips
+    before every first half, and before the second half only for a '1', so
+    the half-period levels are a running XOR over those flips.
+
+    Returns (int16 ndarray of len(frame_bits) * _SPB samples, end_parity).
+    """
+    bits = _np.asarray(frame_bits, dtype=_np.int8)
+    n    = len(bits)
+    transitions = _np.empty(2 * n, dtype=_np.int8)
+    transitions[0::2] = 1         # start-of-bit flip
+    transitions[1::2] = bits      # mid-bit flip on '1'
+    parity  = _np.bitwise_xor.accumulate(transitions) ^ start_parity
+    samples = _np.repeat(_HALF_LEVELS[parity], _np.tile((_HALF_A, _HALF_B), n))
+    if n == 0:
+        return samples, start_parity
+    return samples, int(parity[-1])
+
+
+# Per-byte bitwise NOT: applied to raw int16 PCM it maps _HIGH ↔ _LOW
+_INVERT_BYTES = bytes(range(255, -1, -1))
+
+
+def _pcm_bytes(samples):
+    """int16 samples (ndarray or list) → raw little-endian bytes."""
+    if _HAS_NUMPY and isinstance(samples, _np.ndarray):
+        return samples.astype("<i2", copy=False).tobytes()
+    pcm = array("h", samples)
+    if sys.byteorder != "little":
+        pcm.byteswap()
+    return pcm.tobytes()
+
+
+# Raw LE PCM for one bit, indexed [parity before the bit][bit]
+_BIT_SAMPLES = tuple(
+    (
+        _pcm_bytes([after] * _SPB),                          # '0'
+        _pcm_bytes([after] * _HALF_A + [before] * _HALF_B),  # '1'
+    )
+    for before, after in ((_LOW, _HIGH), (_HIGH, _LOW))
+)
+
+
 class _BMCEncoder:
     """Stateful BMC encoder — phase-continuous across consecutive frames."""
 
     def __init__(self):
-        self._level = _LOW      # start low, first bit always flips to HIGH
-
-    def encode_bit(self, bit):
-        # Always transition at start of bit period
-        self._level = _HIGH if self._level == _LOW else _LOW
-        if bit:
-            # '1' → mid-bit transition after HALF_A samples
-            first  = [self._level] * _HALF_A
-            self._level = _HIGH if self._level == _LOW else _LOW
-            second = [self._level] * _HALF_B
-            return first + second
-        else:
-            # '0' → no mid-bit transition
-            return [self._level] * _SPB
+        self._parity = 0        # start low, first bit always flips to HIGH
 
     def encode_frame(self, frame_bits):
-        """Encode a list of 0/1 bits → list of int16 samples."""
-        out = []
+        """
+        Encode a list of 0/1 bits → int16 samples: an ndarray with numpy,
+        else raw LE bytes joined from the _BIT_SAMPLES table.
+
+        The split is deliberate and matches the track buffer: _frame_blobs
+        inverts a frame with ~ (ndarray) or a byte translate (bytes), and
+        _fill copies the blobs into an int16 ndarray or a bytearray.
+        """
+        if _HAS_NUMPY:
+            samples, self._parity = _encode_frame_np(frame_bits, self._parity)
+            return samples
+        parity = self._parity
+        chunks = []
         for b in frame_bits:
-            out.extend(self.encode_bit(b))
-        return out
+            chunks.append(_BIT_SAMPLES[parity][b])
+            parity ^= 1 ^ b         # '0' ends on the opposite level
+        self._parity = parity
+        return b"".join(chunks)
+
+    def encode_frame_from_mask(self, mask, n_bits):
+        """
+        encode_frame() for a frame held as an int bitmask (bit i ⇔ frame
+        bit i+1, encoded first), without building a Python bit list.
+        """
+        if _HAS_NUMPY:
+            bits = _np.unpackbits(
+                _np.frombuffer(mask.to_bytes((n_bits + 7) // 8, "little"), dtype=_np.uint8),
+                count=n_bits, bitorder="little",
+            )
+            return self.encode_frame(bits)
+        return self.encode_frame((mask >> i) & 1 for i in range(n_bits))
 
 
 # ---------------------------------------------------------------------------
@@ -381,23 +492,35 @@ class _FrameBuilder:
             raise ValueError(f"track must be 'TD' or 'BD', got {track!r}")
         self.track        = track
         self._ch_map      = _TD_CH    if track == "TD" else _BD_CH
-        self._blank_bits  = _TD_BLANK if track == "TD" else _BD_BLANK
+        self._blank_mask  = _TD_BLANK_MASK if track == "TD" else _BD_BLANK_MASK
         self._frame_bits  = _TD_BITS  if track == "TD" else _BD_BITS
         self._frame_samps = self._frame_bits * _SPB   # 846 or 864
-        self._frame       = [0] * self._frame_bits    # current bit state
+        self._frame       = 0    # current bit state: bit i ⇔ 1-based bit i+1
+        # frame state → (frame from LOW, frame from HIGH, flip).  The key
+        # is the state itself, so entries never go stale.
+        self._frame_cache = {}
 
-    def set_channel(self, channel, active):
+    def _bit_index(self, channel):
+        """Validated 0-based frame bit for a channel name."""
         if channel not in self._ch_map:
             raise ValueError(f"Unknown {self.track} channel: {channel!r}")
         bit_num = self._ch_map[channel]
-        if bit_num in self._blank_bits:
+        if (1 << (bit_num - 1)) & self._blank_mask:
             raise ValueError(
                 f"Bit {bit_num} is BLANK (reserved) in {self.track} frame."
             )
-        self._frame[bit_num - 1] = 1 if active else 0
+        return bit_num - 1
+
+    def set_channel(self, channel, active):
+        self.set_bit(self._bit_index(channel), active)
+
+    def set_bit(self, bit0, active):
+        """Set 0-based frame bit *bit0*; the caller guarantees it is valid."""
+        mask = 1 << bit0
+        self._frame = (self._frame | mask) if active else (self._frame & ~mask)
 
     def clear_all(self):
-        self._frame = [0] * self._frame_bits
+        self._frame = 0
 
     def build(self, events, duration_seconds):
         """
@@ -408,58 +531,152 @@ class _FrameBuilder:
         duration_seconds: float
         returns: bytes (raw int16 LE PCM)
         """
+        return bytes(self.build_arrays(
+            [int(ev["time"] * _SR) for ev in events],
+            [self._bit_index(ev["channel"]) for ev in events],
+            [ev["active"] for ev in events],
+            duration_seconds,
+        ))
+
+    def build_arrays(self, ev_samples, ev_bits, ev_active, duration_seconds):
+        """
+        build() on struct-of-arrays events: parallel sequences of absolute
+        sample positions (int), 0-based frame bits (already validated) and
+        active flags.  Events need not be sorted; ties keep their input order.
+
+        Returns a byte memoryview over the raw int16 LE PCM buffer rather
+        than a bytes copy; build() materialises it.
+        """
         self.clear_all()
+        fs = self._frame_samps
         total_samples = int(duration_seconds * _SR)
-        remainder = total_samples % self._frame_samps
+        remainder = total_samples % fs
         if remainder:
-            total_samples += self._frame_samps - remainder
-
-        # OPTIMIZED: Pre-allocate entire output buffer upfront 
-        output    = bytearray(total_samples * 2)
-        enc       = _BMCEncoder()
-        sorted_ev = sorted(events, key=lambda e: int(e["time"] * _SR))
-        cursor    = 0
-
-        for ev in sorted_ev:
-            ev_sample = int(ev["time"] * _SR)
-            # ── Snap to frame boundary before filling ────────────────────────
-            # Events that land mid-frame cause _fill to write a partial frame,
-            # then the next _fill starts a fresh frame at a non-aligned byte.
-            # The decoder locks at the original grid and sees a "corrupt" frame
-            # at every seam, pushing blank-bit integrity just below 98 %.
-            # Floor-snapping ensures (ev_sample - cursor) is always a whole
-            # number of frames, so _fill never produces partial frames.
-            ev_sample = (ev_sample // self._frame_samps) * self._frame_samps
-            if ev_sample <= cursor:   # same frame as last event — update state, don't fill
-                self.set_channel(ev["channel"], ev["active"])
+            total_samples += fs - remainder
+
+        # ── Snap events to the frame grid, once for the whole array ─────────
+        # Events that land mid-frame cause _fill to write a partial frame,
+        # then the next _fill starts a fresh frame at a non-aligned byte.
+        # The decoder locks at the original grid and sees a "corrupt" frame
+        # at every seam, pushing blank-bit integrity just below 98 %.
+        # Floor-snapping ensures every gap is a whole number of frames, so
+        # _fill never produces partial frames.  Events are ordered by their
+        # exact sample (stable), then grouped by snapped frame boundary so
+        # each boundary costs one _fill however many events share it.
+        if _HAS_NUMPY:
+            samples = _np.asarray(ev_samples, dtype=_np.int64)
+            order   = _np.argsort(samples, kind="stable")
+            snapped = samples[order] // fs * fs
+            starts  = _np.flatnonzero(_np.diff(snapped, prepend=-1))
+            bounds  = snapped[starts].tolist()
+            starts  = starts.tolist() + [len(order)]
+            order   = order.tolist()
+        else:
+            order   = sorted(range(len(ev_samples)), key=ev_samples.__getitem__)
+            snapped = [ev_samples[i] // fs * fs for i in order]
+            starts  = [k for k in range(len(order)) if k == 0 or snapped[k] != snapped[k - 1]]
+            bounds  = [snapped[k] for k in starts]
+            starts.append(len(order))
+
+        # Cues past the end still get their frames: the stream runs on to
+        # the last event boundary.
+        if bounds and bounds[-1] > total_samples:
+            total_samples = bounds[-1]
+
+        # OPTIMIZED: Pre-allocate entire output buffer upfront
+        if _HAS_NUMPY:
+            output = _np.empty(total_samples, dtype=_np.int16)
+        else:
+            output = bytearray(total_samples * 2)
+        enc    = _BMCEncoder()
+        cursor = 0
+
+        for g, boundary in enumerate(bounds):
+            # Fold the boundary's events, in order, into one masked update
+            mask_on = mask_off = 0
+            for i in order[starts[g]:starts[g + 1]]:
+                mask = 1 << ev_bits[i]
+                if ev_active[i]:
+                    mask_on  |= mask
+                    mask_off &= ~mask
+                else:
+                    mask_off |= mask
+                    mask_on  &= ~mask
+            frame = (self._frame & ~mask_off) | mask_on
+            if frame == self._frame:
+                # No-op boundary (redundant toggles): the current gap simply
+                # runs on to the next real change
                 continue
-            self._fill(output, enc, cursor, ev_sample)
-            cursor = ev_sample
-            self.set_channel(ev["channel"], ev["active"])
+            if boundary > cursor:
+                self._fill(output, enc, cursor, boundary)
+                cursor = boundary
+            self._frame = frame
 
         self._fill(output, enc, cursor, total_samples)
-        return bytes(output)
+        # Byte view of the buffer (no copy on little-endian hosts)
+        if _HAS_NUMPY:
+            return memoryview(output.astype("<i2", copy=False)).cast("B")
+        return memoryview(output)
+
+    def _frame_blobs(self, parity):
+        """
+        The current frame encoded from *parity* and from the opposite one,
+        plus flip = 1 if the frame ends on the opposite level (so repeats
+        alternate between the two) else 0.  Blobs are int16 ndarrays with
+        numpy, raw LE bytes without.
+
+        Only the LOW-start frame is BMC-encoded; the HIGH-start frame is
+        its bitwise inverse (~ swaps _HIGH and _LOW in int16, and is a
+        per-byte XOR 0xFF on the raw bytes).  Memoised by frame state.
+        """
+        hit = self._frame_cache.get(self._frame)
+        if hit is None:
+            enc = _BMCEncoder()
+            from_low = enc.encode_frame_from_mask(self._frame, self._frame_bits)
+            if _HAS_NUMPY:
+                from_high = ~from_low
+            else:
+                from_high = from_low.translate(_INVERT_BYTES)
+            hit = self._frame_cache[self._frame] = (
+                from_low, from_high, enc._parity,
+            )
+        from_low, from_high, flip = hit
+        if parity:
+            return (from_high, from_low), flip
+        return (from_low, from_high), flip
 
     def _fill(self, output, enc, start, end):
         if start >= end:
             return
-        pos = start
-        while pos < end:
-            frame_pcm   = enc.encode_frame(list(self._frame))
-            can_write   = min(self._frame_samps, end - pos)
-            # OPTIMIZED: Pack exact size needed to avoid alloc overhead
-            frame_bytes = struct.pack(f"<{can_write}h", *frame_pcm[:can_write])
-            byte_s      = pos * 2
-            byte_e      = byte_s + can_write * 2
-            output[byte_s:byte_e] = frame_bytes
-            pos += can_write
+        blobs, flip = self._frame_blobs(enc._parity)
+        n_frames = -(-(end - start) // self._frame_samps)
+        # Parity after n_frames: flips once per frame when flip is set
+        enc._parity ^= flip & n_frames & 1
+
+        # One block is a single frame, or a frame and its inverse when the
+        # level alternates; the gap is that block repeated and truncated.
+        if _HAS_NUMPY:
+            # Whole gap in one call — output is an int16 ndarray here
+            block = _np.concatenate(blobs) if flip else blobs[0]
+            reps  = -(-(end - start) // len(block))
+            output[start:end] = _np.tile(block, reps)[:end - start]
+            return
+
+        # bytes * n is a C-level repeated copy
+        block = (blobs[0] + blobs[1]) if flip else blobs[0]
+        reps, tail = divmod((end - start) * 2, len(block))
+        byte_s = start * 2
+        byte_m = byte_s + reps * len(block)
+        mv = memoryview(output)
+        mv[byte_s:byte_m] = block * reps
+        mv[byte_m:byte_m + tail] = block[:tail]
 
 
 # ---------------------------------------------------------------------------
 # Public bridge API
 # ---------------------------------------------------------------------------
 
-def render_4ch_pcm(sequences, duration_ms):
+def render_4ch_pcm_bytes(sequences, duration_ms):
     """
     Build TD and BD PCM streams from a list of show-sequence dicts.
 
@@ -472,11 +689,13 @@ def render_4ch_pcm(sequences, duration_ms):
 
     Returns
     -------
-    dict  {td_b64, bd_b64, sample_rate, n_samples_td, n_samples_bd}
+    dict  {td_pcm, bd_pcm, sample_rate, n_samples_td, n_samples_bd, skipped}
+          td_pcm / bd_pcm are byte memoryviews of raw Int16 LE PCM.
     """
     duration_s = duration_ms / 1000.0
-    td_events  = []
-    bd_events  = []
+    # Per-track struct-of-arrays events: (sample positions, bits, active),
+    # indexed like _TRACKS
+    events     = (([], [], []), ([], [], []))
     skipped    = 0
 
     for seq in sequences:
@@ -484,33 +703,52 @@ def render_4ch_pcm(sequences, duration_ms):
         mov_name  = seq.get("movement",  "")
         state     = bool(seq.get("state", False))
         time_ms   = float(seq.get("time_ms", seq.get("time", 0)))
-        time_s    = time_ms / 1000.0
 
-        lookup = _CHAR_CHANNEL.get((char_name, mov_name))
+        lookup = _char_channel(char_name, mov_name)
         if lookup is None:
             skipped += 1
             continue
 
-        track, channel = lookup
-        ev = {"time": time_s, "channel": channel, "active": state}
-        if track == "TD":
-            td_events.append(ev)
-        else:
-            bd_events.append(ev)
+        track, bit0 = lookup
+        ev_samples, ev_bits, ev_active = events[track]
+        ev_samples.append(int(time_ms / 1000.0 * _SR))
+        ev_bits.append(bit0)
+        ev_active.append(state)
 
-    td_bytes = _FrameBuilder("TD").build(td_events, duration_s)
-    bd_bytes = _FrameBuilder("BD").build(bd_events, duration_s)
+    # Tracks are built one after the other on purpose: Pyodide has no
+    # threads, and on desktop CPython a two-worker pool measured no faster
+    # (the per-boundary work holds the GIL; the numpy fills are short).
+    td_pcm, bd_pcm = (
+        _FrameBuilder(name).build_arrays(*events[t], duration_s)
+        for t, name in enumerate(_TRACKS)
+    )
 
     return {
-        "td_b64":       base64.b64encode(td_bytes).decode("ascii"),
-        "bd_b64":       base64.b64encode(bd_bytes).decode("ascii"),
+        "td_pcm":       td_pcm,
+        "bd_pcm":       bd_pcm,
         "sample_rate":  _SR,
-        "n_samples_td": len(td_bytes) // 2,
-        "n_samples_bd": len(bd_bytes) // 2,
+        "n_samples_td": len(td_pcm) // 2,
+        "n_samples_bd": len(bd_pcm) // 2,
         "skipped":      skipped,
     }
 
 
+def render_4ch_pcm(sequences, duration_ms):
+    """
+    render_4ch_pcm_bytes() with the PCM base64-encoded for JSON transport.
+
+    Returns
+    -------
+    dict  {td_b64, bd_b64, sample_rate, n_samples_td, n_samples_bd, skipped}
+    """
+    result = render_4ch_pcm_bytes(sequences, duration_ms)
+    return {
+        "td_b64":       _b64.b64encode(result.pop("td_pcm")).decode("ascii"),
+        "bd_b64":       _b64.b64encode(result.pop("bd_pcm")).decode("ascii"),
+        **result,
+    }
+
+
 def render_4ch_pcm_json(sequences_json, duration_ms):
     """
     Safe Pyodide entry point.  Always returns a JSON string.
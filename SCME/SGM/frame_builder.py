@@ -169,34 +169,40 @@ class FrameBuilder:
     ) -> None:
         """
         Write repeating BMC-encoded frames into `output[start*2 : end*2]`.
-        Encodes frame-by-frame, never per-sample — efficient for long gaps.
+        Encodes at most two frames per gap, never per-sample — efficient for
+        long gaps.
         """
         if start_sample >= end_sample:
             return
 
-        # Pre-encode one frame with current state (encoder is stateful — pass
-        # a *copy* of the encoder level for this region, then restore)
-        # Actually, we need phase continuity, so we encode in-place with enc.
-        pos = start_sample  # in samples
-
-        while pos < end_sample:
-            # Encode one full frame
-            frame_pcm = enc.encode_frame(list(self._frame))
-            frame_pcm_bytes = BMCEncoder.to_raw_bytes(frame_pcm)
-
-            # How many samples can we write?
-            samples_remaining = end_sample - pos
-            samples_to_write  = min(self._frame_samps, samples_remaining)
-            byte_start = pos * 2
-            byte_end   = byte_start + samples_to_write * 2
-
-            output[byte_start:byte_end] = frame_pcm_bytes[: samples_to_write * 2]
-            pos += samples_to_write
+        # The gap is n_full whole frames plus a partial tail.  The frame is
+        # fixed, so consecutive copies differ only by the starting level:
+        # they alternate first/second (identical when a frame ends on the
+        # level it started from).  The encoder is still advanced by every
+        # frame emitted, tail included, to keep phase continuity.
+        n_full, tail = divmod(end_sample - start_sample, self._frame_samps)
+        n_frames     = n_full + (1 if tail else 0)
+
+        start_level = enc.level
+        first       = BMCEncoder.to_raw_bytes(enc.encode_frame(self._frame))
+        after_first = enc.level
+        if after_first == start_level:
+            second = first
+        else:
+            second = BMCEncoder.to_raw_bytes(enc.encode_frame(self._frame))
+        enc.reset(after_first if n_frames % 2 else start_level)
+
+        byte_start = start_sample * 2
+        byte_mid   = byte_start + n_full * len(first)
+        pairs, odd = divmod(n_full, 2)
+        output[byte_start:byte_mid] = (first + second) * pairs + (first if odd else b"")
+        if tail:
+            output[byte_mid:byte_mid + tail * 2] = (second if odd else first)[: tail * 2]
 
     # ── Convenience: encode single frame to bytes ────────────────────────────
 
     def encode_current_frame(self) -> bytes:
         """Return the current frame encoded as BMC PCM bytes (one frame only)."""
         enc = BMCEncoder()
-        samples = enc.encode_frame(list(self._frame))
+        samples = enc.encode_frame(self._frame)
         return BMCEncoder.to_raw_bytes(samples)
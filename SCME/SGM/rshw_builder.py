@@ -36,20 +36,30 @@
 #     "<signalData>k__BackingField" → int[]   — BinaryType=7(PrimitiveArray), PTEnum=8(Int32)
 #     "<videoData>k__BackingField"  → byte[]  — BinaryType=7(PrimitiveArray), PTEnum=2(Byte) [null]
 #
-# Self-contained: only uses struct, math, array (all Python stdlib, all in Pyodide).
-# Also fully importable in CPython for offline testing.
+# Self-contained: only uses struct, math, re, array, functools (all Python
+# stdlib, all in Pyodide).  numpy is used for PCM decoding, BMC decoding and
+# signalData layout when it is loaded; otherwise everything runs on the
+# stdlib.  Also fully importable in CPython for offline testing.
 #
 # Main API:
-#   convert_4ch_wav_to_rshw(wav_bytes: bytes) -> bytes
-#   build_rshw(audio_l, audio_r, td_samples, bd_samples, sample_rate=44100) -> bytes
+#   convert_4ch_wav_to_rshw(wav_bytes: bytes) -> bytearray
+#   build_rshw(audio_l, audio_r, td_samples, bd_samples, sample_rate=44100) -> bytearray
 #
 # =============================================================================
 
 from __future__ import annotations
+import functools
 import struct
 import math
+import re
 import array as _array_mod
 
+try:
+    import numpy as _np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
 # ── Hardware constants (KWS-confirmed, matches SCME/SMM/constants.py) ─────────
 _BAUD_RATE     = 4_800
 _TOLERANCE     = 0.30        # ±30% run-length tolerance (analog PLL model)
@@ -62,25 +72,25 @@ _SPB           = 9           # samples per bit (encoder uses integer, not 44100/
 
 # ── WAV parser ─────────────────────────────────────────────────────────────────
 
+# Unsigned 8-bit sample → high byte of its int16 value, (b - 128) & 0xFF
+_U8_TO_S8 = bytes(b ^ 0x80 for b in range(256))
+
+
 def _parse_wav(wav_bytes: bytes):
     """
-    Parse a PCM WAV file and return per-channel int16 sample lists.
+    Parse a PCM WAV file and return per-channel int16 sample sequences.
 
     Returns
     -------
-    channels    : list[list[int]]   — one list per channel, int16 values
+    channels    : list              — one int16 sequence per channel
+                                      (ndarray with numpy, else array('h'))
     sample_rate : int
     num_channels: int
     """
-    import io
-    f = io.BytesIO(wav_bytes)
-
-    riff = f.read(4)
-    if riff != b'RIFF':
+    if wav_bytes[0:4] != b'RIFF':
         raise ValueError("Not a RIFF file")
-    f.read(4)  # file size − 8
-    wave = f.read(4)
-    if wave != b'WAVE':
+    # wav_bytes[4:8] is the file size − 8
+    if wav_bytes[8:12] != b'WAVE':
         raise ValueError("RIFF type is not WAVE")
 
     num_channels = 0
@@ -88,24 +98,23 @@ def _parse_wav(wav_bytes: bytes):
     bits_per_sample = 0
     pcm_data = None
 
-    while f.tell() < len(wav_bytes) - 8:
-        chunk_id   = f.read(4)
-        chunk_size = struct.unpack('<I', f.read(4))[0]
-        chunk_start = f.tell()
+    # Walk the chunks by offset; the loop bound leaves room for an 8-byte
+    # chunk header, so each unpack_from below stays in range.
+    pos = 12
+    while pos < len(wav_bytes) - 8:
+        chunk_id, chunk_size = struct.unpack_from('<4sI', wav_bytes, pos)
+        chunk_start = pos + 8
 
         if chunk_id == b'fmt ':
-            _audio_fmt   = struct.unpack('<H', f.read(2))[0]
-            num_channels = struct.unpack('<H', f.read(2))[0]
-            sample_rate  = struct.unpack('<I', f.read(4))[0]
-            f.read(4)    # byte rate
-            f.read(2)    # block align
-            bits_per_sample = struct.unpack('<H', f.read(2))[0]
-            f.seek(chunk_start + chunk_size)
+            # audio format, channels, sample rate, byte rate, block align, bits
+            (_audio_fmt, num_channels, sample_rate,
+             _byte_rate, _block_align, bits_per_sample) = struct.unpack_from(
+                '<HHIIHH', wav_bytes, chunk_start)
         elif chunk_id == b'data':
-            pcm_data = f.read(chunk_size)
+            # Zero-copy view of the sample bytes
+            pcm_data = memoryview(wav_bytes)[chunk_start:chunk_start + chunk_size]
             break
-        else:
-            f.seek(chunk_start + chunk_size)
+        pos = chunk_start + chunk_size
 
     if pcm_data is None or sample_rate == 0:
         raise ValueError("Could not find fmt or data chunk in WAV")
@@ -114,39 +123,155 @@ def _parse_wav(wav_bytes: bytes):
     bytes_per_sample = bits_per_sample // 8
     total_samples = len(pcm_data) // bytes_per_sample
 
+    # Every branch yields one flat int16 sequence (ndarray or array('h')).
     if bits_per_sample == 16:
-        all_samples = _array_mod.array('h')
-        all_samples.frombytes(pcm_data[:total_samples * 2])
-        all_samples_list = list(all_samples)
+        if _HAS_NUMPY:
+            all_samples = _np.frombuffer(pcm_data, '<i2', total_samples)
+        else:
+            all_samples = _array_mod.array('h')
+            all_samples.frombytes(pcm_data[:total_samples * 2])
     elif bits_per_sample == 8:
         # 8-bit WAV is unsigned; centre at 128 → scale to int16 range
-        all_samples_list = [(b - 128) * 256 for b in pcm_data]
         total_samples = len(pcm_data)
+        if _HAS_NUMPY:
+            all_samples = (_np.frombuffer(pcm_data, _np.uint8)
+                           .astype(_np.int16) - 128) * 256
+        else:
+            # (b - 128) * 256 is the int16 whose high byte is b ^ 0x80
+            # and whose low byte is 0
+            buf = bytearray(total_samples * 2)
+            buf[1::2] = bytes(pcm_data).translate(_U8_TO_S8)
+            all_samples = _array_mod.array('h')
+            all_samples.frombytes(buf)
     elif bits_per_sample == 24:
-        all_samples_list = []
-        for i in range(0, total_samples * 3, 3):
-            v = pcm_data[i] | (pcm_data[i+1] << 8) | (pcm_data[i+2] << 16)
-            if v >= 0x800000:
-                v -= 0x1000000
-            all_samples_list.append(v >> 8)  # scale to int16 range
+        # Sign-extended 24-bit v scaled by v >> 8 is exactly the int16
+        # formed by the upper two bytes of each little-endian triplet,
+        # so the low byte is simply dropped.
+        if _HAS_NUMPY:
+            trip = _np.frombuffer(pcm_data, _np.uint8, total_samples * 3)
+            all_samples = (_np.ascontiguousarray(trip.reshape(-1, 3)[:, 1:])
+                           .view('<i2').reshape(-1))
+        else:
+            buf = bytearray(total_samples * 2)
+            buf[0::2] = pcm_data[1:total_samples * 3:3]
+            buf[1::2] = pcm_data[2:total_samples * 3:3]
+            all_samples = _array_mod.array('h')
+            all_samples.frombytes(buf)
     elif bits_per_sample == 32:
         # float32 WAV
-        raw = _array_mod.array('f')
-        raw.frombytes(pcm_data[:total_samples * 4])
-        all_samples_list = [max(-32768, min(32767, int(s * 32767))) for s in raw]
+        if _HAS_NUMPY:
+            raw = _np.frombuffer(pcm_data, '<f4', total_samples)
+            # float64 multiply + truncation matches int(s * 32767)
+            all_samples = _np.clip(raw.astype(_np.float64) * 32767,
+                                   -32768, 32767).astype(_np.int16)
+        else:
+            raw = _array_mod.array('f')
+            raw.frombytes(pcm_data[:total_samples * 4])
+            all_samples = _array_mod.array(
+                'h', [max(-32768, min(32767, int(s * 32767))) for s in raw])
     else:
         raise ValueError(f"Unsupported bit depth: {bits_per_sample}")
 
-    # De-interleave: [L,R,TD,BD, L,R,TD,BD, ...] → separate channel lists
-    channels = [[] for _ in range(num_channels)]
-    for i, s in enumerate(all_samples_list):
-        channels[i % num_channels].append(s)
+    # De-interleave: [L,R,TD,BD, L,R,TD,BD, ...] → one strided slice per
+    # channel (a zero-copy view for ndarrays).  Slicing rather than a
+    # reshape keeps the trailing samples of a truncated final block.
+    channels = [all_samples[c::num_channels] for c in range(num_channels)]
 
     return channels, sample_rate, num_channels
 
 
 # ── BMC Decoder ────────────────────────────────────────────────────────────────
 
+def _run_lengths(samples, zero_thresh):
+    """
+    Lengths of the maximal same-sign runs of non-silent samples, in order.
+
+    A sample is silent when abs(s) < zero_thresh; silence ends a run and is
+    never counted.  Returns an int ndarray with numpy, else list[int].
+    """
+    if _HAS_NUMPY:
+        a = _np.asarray(samples)
+        # Per-sample class as one uint8 stream: 0 = silent, 1 = positive,
+        # 2 = non-positive — the loud flag shifted left by the sign bit.
+        # Comparing against ±zero_thresh instead of abs() works on int16
+        # directly (no widening copy, no abs(-32768) wrap).  The stream is
+        # padded with a silent sentinel at each end, so every loud run is
+        # bounded by two class changes, including runs touching the edges.
+        cls = _np.zeros(a.size + 2, dtype=_np.uint8)
+        loud = (a >= zero_thresh) | (a <= -zero_thresh)
+        _np.left_shift(loud.view(_np.uint8), (a <= 0).view(_np.uint8),
+                       out=cls[1:-1])
+        # edges[k] = sample index where segment k starts
+        edges = _np.flatnonzero(cls[1:] != cls[:-1])
+        return _np.diff(edges)[cls[edges[:-1] + 1] != 0]
+
+    runs = []
+    i = 0
+    n = len(samples)
+    while i < n:
+        s = samples[i]
+        if abs(s) < zero_thresh:
+            i += 1
+            continue
+        positive = (s > 0)
+        start = i
+        while i < n and ((samples[i] > 0) == positive) and abs(samples[i]) >= zero_thresh:
+            i += 1
+        runs.append(i - start)          # store run length only (start pos not needed)
+    return runs
+
+
+# Run classes for _decode_runs_np: full-period run, half-period run that
+# pairs with its successor, anything else.
+_RUN_FULL, _RUN_PAIR, _RUN_SKIP = b'F', b'P', b'x'
+_PAIR_RE = re.compile(_RUN_PAIR + b'.', re.DOTALL)
+_RUN_TO_BIT = bytes.maketrans(b'Fp', b'\x00\x01')
+
+
+def _decode_runs_np(runs, fl_lo, fl_hi, ha_lo, ha_hi):
+    """
+    numpy form of the run → bit state machine in _decode_bmc.
+
+    Each run is classified in one vectorized pass (the half+half and
+    half+remainder tests only look at the next run), giving one byte per
+    run.  The state machine then reduces to a left-to-right scan that
+    consumes "P + successor" as a '1' and every other run on its own —
+    exactly what a non-overlapping regex substitution of P. does.
+
+    Returns a uint8 ndarray of bits.
+    """
+    r = _np.asarray(runs)
+    full = (r >= fl_lo) & (r <= fl_hi)
+    half = (r >= ha_lo) & (r <= ha_hi)
+    pair = _np.zeros(r.size, dtype=bool)
+    if r.size > 1:
+        pair_sum = r[:-1] + r[1:]
+        pair[:-1] = half[:-1] & (half[1:] | ((pair_sum >= fl_lo) & (pair_sum <= fl_hi)))
+    # full is tested first, exactly as in the scalar loop
+    cls = _np.where(full, ord(_RUN_FULL),
+                    _np.where(pair, ord(_RUN_PAIR), ord(_RUN_SKIP))).astype(_np.uint8)
+    tokens = _PAIR_RE.sub(b'p', cls.tobytes())
+    return _np.frombuffer(tokens.translate(_RUN_TO_BIT, _RUN_SKIP + _RUN_PAIR),
+                          dtype=_np.uint8)
+
+
+@functools.lru_cache(maxsize=8)
+def _bmc_bounds(sample_rate, baud_rate, tolerance):
+    """
+    Integer run-length bounds (fl_lo, fl_hi, ha_lo, ha_hi) for full- and
+    half-period runs.  Only a handful of (rate, baud, tolerance) combos are
+    ever used, so they are computed once each.
+    """
+    nom_full = sample_rate / baud_rate      # nominal full-bit run (float)
+    nom_half = nom_full / 2.0
+
+    fl_lo = math.floor(nom_full * (1 - tolerance))
+    fl_hi = math.ceil( nom_full * (1 + tolerance))
+    ha_lo = math.floor(nom_half * (1 - tolerance))
+    ha_hi = math.ceil( nom_half * (1 + tolerance))
+    return fl_lo, fl_hi, ha_lo, ha_hi
+
+
 def _decode_bmc(samples, sample_rate=44100, baud_rate=4800,
                 tolerance=0.30, zero_thresh=200):
     """
@@ -167,35 +292,21 @@ def _decode_bmc(samples, sample_rate=44100, baud_rate=4800,
 
     Returns
     -------
-    list[int]  — decoded bits (0 or 1), in transmission order
+    uint8 ndarray with numpy, else list[int]
+               — decoded bits (0 or 1), in transmission order
     """
-    nom_full = sample_rate / baud_rate      # nominal full-bit run (float)
-    nom_half = nom_full / 2.0
-
-    fl_lo = math.floor(nom_full * (1 - tolerance))
-    fl_hi = math.ceil( nom_full * (1 + tolerance))
-    ha_lo = math.floor(nom_half * (1 - tolerance))
-    ha_hi = math.ceil( nom_half * (1 + tolerance))
+    fl_lo, fl_hi, ha_lo, ha_hi = _bmc_bounds(sample_rate, baud_rate, tolerance)
 
     def is_full(r): return fl_lo <= r <= fl_hi
     def is_half(r): return ha_lo <= r <= ha_hi
 
     # ── Build run-length list ────────────────────────────────────────────────
-    runs = []
-    i = 0
-    n = len(samples)
-    while i < n:
-        s = samples[i]
-        if abs(s) < zero_thresh:
-            i += 1
-            continue
-        positive = (s > 0)
-        start = i
-        while i < n and ((samples[i] > 0) == positive) and abs(samples[i]) >= zero_thresh:
-            i += 1
-        runs.append(i - start)          # store run length only (start pos not needed)
+    runs = _run_lengths(samples, zero_thresh)
 
     # ── Decode BMC bits from runs ────────────────────────────────────────────
+    if _HAS_NUMPY:
+        return _decode_runs_np(runs, fl_lo, fl_hi, ha_lo, ha_hi)
+
     bits = []
     idx = 0
     total = len(runs)
@@ -238,7 +349,13 @@ def _bits_to_frames(bits, frame_bits):
     The last partial frame (if any) is discarded.
 
     Returns list[list[int]]  — each inner list has exactly frame_bits ints (0 or 1).
+    With numpy this is instead an (n_frames, frame_bits) uint8 view of `bits`.
     """
+    if _HAS_NUMPY:
+        bits = _np.asarray(bits, dtype=_np.uint8)
+        n = len(bits) // frame_bits
+        return bits[:n * frame_bits].reshape(n, frame_bits)
+
     frames = []
     for i in range(0, len(bits) - frame_bits + 1, frame_bits):
         frames.append(bits[i:i + frame_bits])
@@ -247,9 +364,26 @@ def _bits_to_frames(bits, frame_bits):
 
 # ── Stereo WAV builder ─────────────────────────────────────────────────────────
 
+def _clip_int16(samples, n):
+    """
+    First n samples as an ndarray clamped to the int16 range.  Clip then
+    truncate-on-store matches max(-32768, min(32767, int(x))); int16 input
+    (the usual case, straight from _parse_wav) is already in range and is
+    passed through as a view.
+    """
+    a = _np.asarray(samples)[:n]
+    if a.dtype == _np.int16:
+        return a
+    return _np.clip(a, -32768, 32767)
+
+
 def _build_stereo_wav(left, right, sample_rate):
     """
-    Build a minimal 16-bit stereo PCM WAV from two int16 sample lists.
+    Build a minimal 16-bit stereo PCM WAV from two int16 sample lists,
+    as two pieces: the 44-byte RIFF/fmt/data header and the interleaved
+    PCM buffer (int16 ndarray or array('h')).  Keeping them apart lets
+    _serialize_rshw_format copy the PCM straight into its output instead
+    of first concatenating a complete WAV.
 
     Parameters
     ----------
@@ -258,31 +392,34 @@ def _build_stereo_wav(left, right, sample_rate):
 
     Returns
     -------
-    bytes  — complete WAV file
+    (bytes, buffer)  — WAV header, interleaved PCM
     """
     n = min(len(left), len(right))
 
-    # OPTIMIZED: Pre-allocate interleaved array with exact size
-    interleaved = _array_mod.array('h', [0] * (n * 2))
-    for i in range(n):
-        interleaved[i * 2] = max(-32768, min(32767, int(left[i])))
-        interleaved[i * 2 + 1] = max(-32768, min(32767, int(right[i])))
-
-    pcm_bytes = interleaved.tobytes()
+    if _HAS_NUMPY:
+        interleaved = _np.empty(n * 2, dtype='<i2')
+        interleaved[0::2] = _clip_int16(left, n)
+        interleaved[1::2] = _clip_int16(right, n)
+    else:
+        # OPTIMIZED: Pre-allocate interleaved array with exact size
+        interleaved = _array_mod.array('h', [0] * (n * 2))
+        for i in range(n):
+            interleaved[i * 2] = max(-32768, min(32767, int(left[i])))
+            interleaved[i * 2 + 1] = max(-32768, min(32767, int(right[i])))
 
     num_ch     = 2
     bps        = 16
     block_align = num_ch * (bps // 8)
     byte_rate   = sample_rate * block_align
-    data_size   = len(pcm_bytes)
+    data_size   = n * block_align
 
     hdr = struct.pack('<4sI4s', b'RIFF', 36 + data_size, b'WAVE')
     fmt = struct.pack('<4sIHHIIHH',
                       b'fmt ', 16, 1, num_ch, sample_rate,
                       byte_rate, block_align, bps)
-    dat = struct.pack('<4sI', b'data', data_size) + pcm_bytes
+    dat = struct.pack('<4sI', b'data', data_size)
 
-    return hdr + fmt + dat
+    return hdr + fmt + dat, interleaved
 
 
 # ── NRBF / BinaryFormatter Serializer ─────────────────────────────────────────
@@ -301,73 +438,45 @@ def _lps(s: str) -> bytes:
     return bytes(header) + b
 
 
-def _i32(v: int) -> bytes:
-    """Pack one signed 32-bit int, little-endian."""
-    return struct.pack('<i', v)
-
-
-def _serialize_rshw_format(audio_data: bytes, signal_data: list) -> bytes:
-    """
-    Serialize an rshwFormat object as .NET BinaryFormatter (NRBF) binary.
-
-    Wire format (MS-NRBF, all little-endian):
-      [0x00] SerializedStreamHeader  (rootId=1, headerId=-1, major=1, minor=0)
-      [0x0C] BinaryLibrary           (id=2, "Assembly-CSharp, ...")
-      [0x05] ClassWithMembersAndTypes (objectId=1, "rshwFormat", 3 members)
-               MemberNames: <audioData>k__BackingField
-                            <signalData>k__BackingField
-                            <videoData>k__BackingField
-               BinaryTypeEnum: 7, 7, 7  (all PrimitiveArray)
-               AdditionalTypeInfo: 2(Byte), 8(Int32), 2(Byte)
-               LibraryId: 2
-      [0x0F] ArraySinglePrimitive    (objectId=3, byte[], audioData bytes)
-      [0x0F] ArraySinglePrimitive    (objectId=4, int32[], signalData ints)
-      [0x0A] ObjectNull              (videoData = null)
-      [0x0B] MessageEnd
+# The fixed NRBF strings, length-prefixed once at import
+_LPS_ASSEMBLY     = _lps("Assembly-CSharp, Version=0.0.0.0, Culture=neutral, PublicKeyToken=null")
+_LPS_RSHW         = _lps("rshwFormat")
+_LPS_AUDIO_FIELD  = _lps("<audioData>k__BackingField")
+_LPS_SIGNAL_FIELD = _lps("<signalData>k__BackingField")
+_LPS_VIDEO_FIELD  = _lps("<videoData>k__BackingField")
 
-    PrimitiveTypeEnumeration used:
-      2  = Byte   (for byte[])
-      8  = Int32  (for int[])
-    """
-    out = bytearray()
+_NRBF_LIB_ID    = 2
+_NRBF_AUDIO_ID  = 3
+_NRBF_SIGNAL_ID = 4
 
+# Everything before the audioData array record is the same for every file,
+# so it is assembled once here (see _serialize_rshw_format for the layout).
+_HDR_PREFIX = b''.join((
     # ── 1. SerializedStreamHeader (record type 0) ──────────────────────────
-    out += bytes([0x00])    # RecordTypeEnum
-    out += _i32(1)          # rootId       = 1
-    out += _i32(-1)         # headerId     = −1
-    out += _i32(1)          # majorVersion = 1
-    out += _i32(0)          # minorVersion = 0
+    #      RecordTypeEnum, rootId=1, headerId=−1, majorVersion=1, minorVersion=0
+    struct.pack('<Biiii', 0x00, 1, -1, 1, 0),
 
     # ── 2. BinaryLibrary (record type 12 = 0x0C) ───────────────────────────
-    lib_id = 2
-    out += bytes([0x0C])    # RecordTypeEnum
-    out += _i32(lib_id)     # LibraryId
-    out += _lps("Assembly-CSharp, Version=0.0.0.0, Culture=neutral, PublicKeyToken=null")
+    struct.pack('<Bi', 0x0C, _NRBF_LIB_ID),             # RecordTypeEnum, LibraryId
+    _LPS_ASSEMBLY,
 
     # ── 3. ClassWithMembersAndTypes (record type 5 = 0x05) ─────────────────
     #      This is the root rshwFormat object (objectId=1).
-    out += bytes([0x05])            # RecordTypeEnum
-    out += _i32(1)                  # ObjectId = 1 (root)
-    out += _lps("rshwFormat")       # ClassName
-    out += _i32(3)                  # MemberCount
-
+    struct.pack('<Bi', 0x05, 1),                        # RecordTypeEnum, ObjectId
+    _LPS_RSHW,                                          # ClassName
+    struct.pack('<i', 3),                               # MemberCount
     # Member names  (auto-property backing fields generated by C# compiler)
-    out += _lps("<audioData>k__BackingField")
-    out += _lps("<signalData>k__BackingField")
-    out += _lps("<videoData>k__BackingField")
-
+    _LPS_AUDIO_FIELD,
+    _LPS_SIGNAL_FIELD,
+    _LPS_VIDEO_FIELD,
     # BinaryTypeEnum for each member:
     #   7 = PrimitiveArray  (applies to byte[], int[], and null byte[])
-    out += bytes([7, 7, 7])
-
     # AdditionalTypeInfo (PrimitiveTypeEnumeration) for each PrimitiveArray:
     #   2 = Byte   (audioData -> byte[])
     #   8 = Int32  (signalData -> int[])
     #   2 = Byte   (videoData -> byte[], will be null)
-    out += bytes([2, 8, 2])
-
     # LibraryId back-reference
-    out += _i32(lib_id)
+    struct.pack('<6Bi', 7, 7, 7, 2, 8, 2, _NRBF_LIB_ID),
 
     # ── 4. Member VALUES (for each reference-type member):
     #      RecordTypeEnum 0x09 = MemberReference + ObjectId (4 bytes)
@@ -376,39 +485,125 @@ def _serialize_rshw_format(audio_data: bytes, signal_data: list) -> bytes:
     #  .NET BinaryFormatter always writes MemberReference records here
     #  (never embeds the array records directly as member values).
     #  The actual array data follows as separate top-level records.
+    struct.pack('<BiBiB',
+                0x09, _NRBF_AUDIO_ID,       # MemberReference → audioData   (id=3)
+                0x09, _NRBF_SIGNAL_ID,      # MemberReference → signalData  (id=4)
+                0x0A),                      # ObjectNull       → videoData   (null)
+))
+
+# ArraySinglePrimitive record head (type 15 = 0x0F):
+#   RecordTypeEnum, ObjectId, Length (element count), PrimitiveTypeEnum
+_ARRAY_HDR = struct.Struct('<BiiB')
+
+
+def _serialize_rshw_format(audio_data: bytes, signal_data) -> bytearray:
+    """
+    Serialize an rshwFormat object as .NET BinaryFormatter (NRBF) binary.
+
+    Wire format (MS-NRBF, all little-endian):
+      [0x00] SerializedStreamHeader  (rootId=1, headerId=-1, major=1, minor=0)
+      [0x0C] BinaryLibrary           (id=2, "Assembly-CSharp, ...")
+      [0x05] ClassWithMembersAndTypes (objectId=1, "rshwFormat", 3 members)
+               MemberNames: <audioData>k__BackingField
+                            <signalData>k__BackingField
+                            <videoData>k__BackingField
+               BinaryTypeEnum: 7, 7, 7  (all PrimitiveArray)
+               AdditionalTypeInfo: 2(Byte), 8(Int32), 2(Byte)
+               LibraryId: 2
+      [0x0F] ArraySinglePrimitive    (objectId=3, byte[], audioData bytes)
+      [0x0F] ArraySinglePrimitive    (objectId=4, int32[], signalData ints)
+      [0x0A] ObjectNull              (videoData = null)
+      [0x0B] MessageEnd
 
-    audio_id  = 3
-    signal_id = 4
+    PrimitiveTypeEnumeration used:
+      2  = Byte   (for byte[])
+      8  = Int32  (for int[])
 
-    out += bytes([0x09]) + _i32(audio_id)   # MemberReference → audioData   (id=3)
-    out += bytes([0x09]) + _i32(signal_id)  # MemberReference → signalData  (id=4)
-    out += bytes([0x0A])                    # ObjectNull       → videoData   (null)
+    audio_data is bytes-like, or a tuple of bytes-like pieces that make up
+    the byte[] back to back.
+    signal_data may be a list of ints, an array('i') or an int32 ndarray.
+    Returns the serialized file as a bytearray.
+    """
+    # audioData may come as several buffers (e.g. WAV header + PCM from
+    # _build_stereo_wav); they are copied in back to back.
+    audio_parts = [memoryview(p).cast('B') for p in
+                   (audio_data if isinstance(audio_data, tuple) else (audio_data,))]
+    audio_len = sum(map(len, audio_parts))
+
+    # signalData as a flat int32 buffer.  An int32 ndarray (from
+    # _build_signal_data) or array('i') is used as-is; anything else goes
+    # through array('i').
+    if _HAS_NUMPY and isinstance(signal_data, _np.ndarray):
+        sig = memoryview(_np.ascontiguousarray(signal_data, dtype='<i4')).cast('B')
+    else:
+        if not (isinstance(signal_data, _array_mod.array) and signal_data.typecode == 'i'):
+            signal_data = _array_mod.array('i', signal_data)
+        sig = memoryview(signal_data).cast('B')
+    signal_len = len(sig) // 4          # element count, whatever the input type
+
+    # Fixed prefix + two array records + MessageEnd: the size is exact, so
+    # one bytearray is allocated and each piece is copied into place.
+    hdr = _ARRAY_HDR.size
+    out = bytearray(len(_HDR_PREFIX) + hdr + audio_len + hdr + len(sig) + 1)
+    pos = len(_HDR_PREFIX)
+    out[:pos] = _HDR_PREFIX                 # records 1-4
 
     # ── 5a. audioData actual data: ArraySinglePrimitive (type 15 = 0x0F) ──
-    out += bytes([0x0F])            # RecordTypeEnum
-    out += _i32(audio_id)           # ObjectId
-    out += _i32(len(audio_data))    # Length (element count)
-    out += bytes([2])               # PrimitiveTypeEnum.Byte
-    out += audio_data               # raw byte data
+    _ARRAY_HDR.pack_into(out, pos, 0x0F, _NRBF_AUDIO_ID, audio_len, 2)          # Byte
+    pos += hdr
+    for part in audio_parts:                            # raw byte data
+        out[pos:pos + len(part)] = part
+        pos += len(part)
 
     # ── 5b. signalData actual data: ArraySinglePrimitive (int32[]) ────────
-    out += bytes([0x0F])            # RecordTypeEnum
-    out += _i32(signal_id)          # ObjectId
-    out += _i32(len(signal_data))   # Length (element count)
-    out += bytes([8])               # PrimitiveTypeEnum.Int32
-
-    # Pack all int32 values in one shot using array module for speed
-    sig_arr = _array_mod.array('i', signal_data)
-    out += sig_arr.tobytes()
+    _ARRAY_HDR.pack_into(out, pos, 0x0F, _NRBF_SIGNAL_ID, signal_len, 8)        # Int32
+    pos += hdr
+    out[pos:pos + len(sig)] = sig
+    pos += len(sig)
 
     # ── 6. MessageEnd (type 11 = 0x0B) ────────────────────────────────────
-    out += bytes([0x0B])
+    out[pos] = 0x0B
 
-    return bytes(out)
+    # The buffer is exactly the payload: hand it over as-is rather than
+    # paying for a second full-size copy via bytes(out).
+    return out
 
 
 # ── Signal data builder ────────────────────────────────────────────────────────
 
+def _frame_ones(frames, offset):
+    """
+    For each frame, the list of `bit_idx + offset` for its ON bits
+    (bit_idx 0-based), ascending.
+    """
+    return [[i + offset for i, v in enumerate(f) if v] for f in frames]
+
+
+def _frame_ones_np(frames, frame_bits, offset):
+    """
+    numpy form of _frame_ones, flattened: the `bit_idx + offset` values of
+    every ON bit as one int32 array in frame order, plus each frame's
+    start and count in it.  One extra empty frame is appended as a
+    sentinel for out-of-range frame indices.
+    """
+    frames = _np.asarray(frames).reshape(-1, frame_bits)
+    rows, cols = _np.nonzero(frames)
+    count = _np.bincount(rows, minlength=len(frames) + 1)
+    start = _np.cumsum(count) - count
+    return cols.astype('<i4') + offset, start, count
+
+
+def _scatter_ranges(out, dst, src, src_start, count):
+    """
+    out[dst[k] : dst[k] + count[k]] = src[src_start[k] : src_start[k] + count[k]]
+    for every k, in one fancy-indexed copy.
+    """
+    # Position of each copied element within its own range
+    offs = (_np.arange(int(count.sum()))
+            - _np.repeat(_np.cumsum(count) - count, count))
+    out[_np.repeat(dst, count) + offs] = src[_np.repeat(src_start, count) + offs]
+
+
 def _build_signal_data(td_frames, bd_frames, audio_length_s, fps=_RSHW_FPS,
                        sample_rate=44100,
                        samples_per_bit=_SPB,
@@ -446,6 +641,38 @@ def _build_signal_data(td_frames, bd_frames, audio_length_s, fps=_RSHW_FPS,
     bd_frame_s = (bd_frame_bits * samples_per_bit) / sample_rate   # 864/44100
 
     total_rshw_frames = int(audio_length_s * fps)
+
+    if _HAS_NUMPY:
+        # ON-bit values of every BMC frame, scanned once, with an empty
+        # sentinel frame at index n_frames for indices past the last one.
+        td_vals, td_start, td_count = _frame_ones_np(td_frames, td_frame_bits, 1)
+        bd_vals, bd_start, bd_count = _frame_ones_np(bd_frames, bd_frame_bits, 151)
+
+        # TD/BD frame index of every rshw frame, t = frame_num / fps.
+        # Same float ops as int(t / td_frame_s), just all at once.
+        t = _np.arange(total_rshw_frames) / fps
+        td_at = _np.minimum((t / td_frame_s).astype(_np.int64), len(td_count) - 1)
+        bd_at = _np.minimum((t / bd_frame_s).astype(_np.int64), len(bd_count) - 1)
+
+        # Each rshw frame is [0, td values..., bd values...]; with the
+        # lengths known up front the whole stream is laid out at once.
+        td_n = td_count[td_at]
+        bd_n = bd_count[bd_at]
+        frame_len = 1 + td_n + bd_n
+        frame_pos = _np.cumsum(frame_len) - frame_len
+        signal_data = _np.zeros(int(frame_len.sum()), dtype='<i4')   # delimiters
+        _scatter_ranges(signal_data, frame_pos + 1, td_vals, td_start[td_at], td_n)
+        _scatter_ranges(signal_data, frame_pos + 1 + td_n, bd_vals, bd_start[bd_at], bd_n)
+        return signal_data
+
+    # signalData values of each BMC frame's ON bits, scanned once up front.
+    # One empty sentinel frame is appended to each track: a frame index
+    # past the decoded frames is clamped onto it and emits nothing.
+    td_ones = _frame_ones(td_frames, 1)
+    bd_ones = _frame_ones(bd_frames, 151)
+    n_td, n_bd = len(td_ones), len(bd_ones)
+    td_ones.append([])
+    bd_ones.append([])
     signal_data = []
 
     for rshw_frame_num in range(total_rshw_frames):
@@ -454,27 +681,33 @@ def _build_signal_data(td_frames, bd_frames, audio_length_s, fps=_RSHW_FPS,
         # Frame delimiter
         signal_data.append(0)
 
-        # TD frame index
-        td_idx = int(t / td_frame_s)
-        if td_idx < len(td_frames):
-            frame = td_frames[td_idx]
-            for bit_idx, bit_val in enumerate(frame):
-                if bit_val:
-                    signal_data.append(bit_idx + 1)
-
-        # BD frame index
-        bd_idx = int(t / bd_frame_s)
-        if bd_idx < len(bd_frames):
-            frame = bd_frames[bd_idx]
-            for bit_idx, bit_val in enumerate(frame):
-                if bit_val:
-                    signal_data.append(bit_idx + 151)
+        # TD / BD frame index
+        signal_data.extend(td_ones[min(int(t / td_frame_s), n_td)])
+        signal_data.extend(bd_ones[min(int(t / bd_frame_s), n_bd)])
 
     return signal_data
 
 
 # ── Public API ─────────────────────────────────────────────────────────────────
 
+def _as_samples(samples):
+    """
+    Normalise one channel of input samples.
+
+    With numpy this is an ndarray — a zero-copy view for ndarrays and
+    array('h'), so the vectorized decode/interleave stages never box each
+    sample as a Python int.  Without numpy it is a list of Python ints;
+    ndarray / array('h') go through tolist(), since list() would yield
+    numpy int16 scalars whose abs() wraps at -32768.
+    """
+    if _HAS_NUMPY:
+        if not isinstance(samples, (_np.ndarray, _array_mod.array, list, tuple)):
+            samples = list(samples)         # JS proxies, generators, ...
+        return _np.asarray(samples)
+    tolist = getattr(samples, 'tolist', None)
+    return tolist() if tolist is not None else list(samples)
+
+
 def build_rshw(audio_l, audio_r, td_samples, bd_samples, sample_rate=44100):
     """
     Convert pre-separated 4-channel WAV data to .rshw showtape format.
@@ -496,15 +729,15 @@ def build_rshw(audio_l, audio_r, td_samples, bd_samples, sample_rate=44100):
 
     Returns
     -------
-    bytes
+    bytearray
         Complete .rshw file, ready to load in RR-Engine / SPTE.
         Contains a .NET BinaryFormatter NRBF-serialized rshwFormat object.
     """
-    # Convert to plain int lists (handles numpy arrays, JS proxies, etc.)
-    audio_l   = list(audio_l)
-    audio_r   = list(audio_r)
-    td_samples = list(td_samples)
-    bd_samples = list(bd_samples)
+    # Normalise inputs (handles numpy arrays, JS proxies, etc.)
+    audio_l   = _as_samples(audio_l)
+    audio_r   = _as_samples(audio_r)
+    td_samples = _as_samples(td_samples)
+    bd_samples = _as_samples(bd_samples)
 
     # ── Decode BMC ──────────────────────────────────────────────────────────
     td_bits   = _decode_bmc(td_samples, sample_rate, _BAUD_RATE, _TOLERANCE, _ZERO_THRESH)
@@ -520,10 +753,10 @@ def build_rshw(audio_l, audio_r, td_samples, bd_samples, sample_rate=44100):
                                       sample_rate=sample_rate)
 
     # ── Build stereo audio WAV ──────────────────────────────────────────────
-    stereo_wav_bytes = _build_stereo_wav(audio_l, audio_r, sample_rate)
+    stereo_wav = _build_stereo_wav(audio_l, audio_r, sample_rate)
 
     # ── Serialize as rshwFormat NRBF ────────────────────────────────────────
-    return _serialize_rshw_format(stereo_wav_bytes, signal_data)
+    return _serialize_rshw_format(stereo_wav, signal_data)
 
 
 def convert_4ch_wav_to_rshw(wav_bytes):
@@ -546,7 +779,7 @@ def convert_4ch_wav_to_rshw(wav_bytes):
 
     Returns
     -------
-    bytes
+    bytearray
         Complete .rshw file, ready to load in RR-Engine / SPTE.
 
     Raises
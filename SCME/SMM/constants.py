@@ -296,3 +296,13 @@ BD_FRAME_BITS = 96
 # -----------------------------------------------------------------------------
 TD_BIT_TO_NAME = {v: k for k, v in TD_CHANNELS.items()}
 BD_BIT_TO_NAME = {v: k for k, v in BD_CHANNELS.items()}
+
+# Dense position-indexed forms: NAME_BY_BIT[i] is the channel on 1-based bit
+# i + 1, or None for blank/unassigned bits.  A tuple index beats a dict
+# lookup for per-bit work in the frame decoder.
+TD_NAME_BY_BIT = tuple(TD_BIT_TO_NAME.get(i + 1) for i in range(TD_FRAME_BITS))
+BD_NAME_BY_BIT = tuple(BD_BIT_TO_NAME.get(i + 1) for i in range(BD_FRAME_BITS))
+
+# Blank bits as an integer mask (bit b-1 set for each 1-based blank bit b)
+TD_BLANK_MASK = sum(1 << (b - 1) for b in TD_BLANK_BITS)
+BD_BLANK_MASK = sum(1 << (b - 1) for b in BD_BLANK_BITS)
@@ -24,12 +24,61 @@
 # =============================================================================
 
 from __future__ import annotations
+import heapq
 import math
-from typing import Sequence, NamedTuple
+import re
+from itertools import repeat
+from operator import attrgetter
+from typing import Iterable, Iterator, Sequence, NamedTuple
+
+try:
+    import numpy as _np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
+
+from SCME.SMM.constants import SAMPLE_RATE, BAUD_RATE
 
 TOLERANCE_FACTOR = 0.30   # ±30% of nominal run length
 
 
+def _tolerance_windows(
+    sample_rate: int, baud_rate: int, tolerance: float
+) -> tuple[int, int, int, int]:
+    """(full_lo, full_hi, half_lo, half_hi) run-length windows in samples."""
+    nom_full = sample_rate / baud_rate
+    nom_half = nom_full / 2
+    return (
+        math.floor(nom_full * (1 - tolerance)),
+        math.ceil(nom_full  * (1 + tolerance)),
+        math.floor(nom_half * (1 - tolerance)),
+        math.ceil(nom_half  * (1 + tolerance)),
+    )
+
+
+# Windows for the hardware defaults, computed once at import
+_DEFAULT_KEY     = (SAMPLE_RATE, BAUD_RATE, TOLERANCE_FACTOR)
+_DEFAULT_WINDOWS = _tolerance_windows(*_DEFAULT_KEY)
+
+# Run classes for BMCDecoder._consume_runs_np (one byte per run)
+_RUN_FULL     = ord('F')   # full run                             → bit 0
+_RUN_PAIR     = ord('P')   # half + half, or half + rest ≈ full   → bit 1
+_RUN_TRAIL    = ord('T')   # half run at end of stream            → bit 1, marginal
+_RUN_BROKEN   = ord('E')   # half + non-half, sum not full        → error
+_RUN_BAD      = ord('X')   # outside every window                 → error
+# Greedy left-to-right pairing: each P run swallows its successor.  The
+# literal replacement keeps the length, so token i still describes run i
+# ('#' marks a run consumed as the second half of a pair).
+_PAIR_RE = re.compile(b'P.', re.DOTALL)
+_PAIR_TOKEN = b'P#'
+
+# Runs turned into records per step of BMCDecoder.decode_iter
+_ITER_CHUNK = 4096
+# Samples per block in BMCDecoder.decode_chunked (1 MiB of int16)
+_CHUNK_SAMPLES = 1 << 19
+_sample_pos = attrgetter('sample_pos')
+
+
 class DecodedBit(NamedTuple):
     bit:         int    # 0 or 1
     sample_pos:  int    # sample index at start of this bit period
@@ -62,8 +111,8 @@ class BMCDecoder:
 
     def __init__(
         self,
-        sample_rate: int = 44_100,
-        baud_rate: int = 4_800,
+        sample_rate: int = SAMPLE_RATE,
+        baud_rate: int = BAUD_RATE,
         tolerance: float = TOLERANCE_FACTOR,
         zero_threshold: int = 200,
     ):
@@ -78,32 +127,162 @@ class BMCDecoder:
         self.nom_half = spb / 2               # nominal half-bit run
 
         # Tolerance windows  [lo, hi]
-        self._full_lo = math.floor(self.nom_full * (1 - tolerance))
-        self._full_hi = math.ceil(self.nom_full  * (1 + tolerance))
-        self._half_lo = math.floor(self.nom_half * (1 - tolerance))
-        self._half_hi = math.ceil(self.nom_half  * (1 + tolerance))
+        if (sample_rate, baud_rate, tolerance) == _DEFAULT_KEY:
+            windows = _DEFAULT_WINDOWS
+        else:
+            windows = _tolerance_windows(sample_rate, baud_rate, tolerance)
+        self._full_lo, self._full_hi, self._half_lo, self._half_hi = windows
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def decode(
-        self, samples: Sequence[int]
+        self, samples: Sequence[int], as_array: bool = False
     ) -> tuple[list[DecodedBit], list[BitError]]:
         """
         Decode a full PCM channel into BMC bits.
 
+        Parameters
+        ----------
+        samples  : PCM channel — an int16 numpy array is consumed in place
+                   (no list conversion needed), or a list of ints
+        as_array : return only the bit values, one byte per bit — an
+                   np.uint8 array (a bytearray without numpy) — instead of
+                   DecodedBit records.  Ready to pass to sync_frames.
+
         Returns
         -------
-        bits   : list[DecodedBit]
+        bits   : list[DecodedBit]  (or uint8 bit values if as_array)
         errors : list[BitError]
         """
-        runs       = self._run_lengths(samples)
         bits:   list[DecodedBit] = []
         errors: list[BitError]   = []
-        self._consume_runs(runs, bits, errors)
+        starts, lengths = self._run_lengths(samples)
+        if _HAS_NUMPY:
+            bit_vals = self._consume_runs_np(
+                starts, lengths, None if as_array else bits, errors)
+            if as_array:
+                return bit_vals, errors
+        else:
+            self._consume_runs(starts, lengths, bits, errors)
+            if as_array:
+                return bytearray(b.bit for b in bits), errors
         return bits, errors
 
+    def decode_iter(
+        self, samples: Sequence[int]
+    ) -> Iterator[DecodedBit | BitError]:
+        """
+        Lazy form of decode(): yield DecodedBits and BitErrors interleaved in
+        stream (sample_pos) order, without materialising either list.
+
+        With numpy the runs are still classified in one vectorized pass, but
+        records are only built _ITER_CHUNK runs at a time as the caller
+        pulls them.
+        """
+        starts, lengths = self._run_lengths(samples)
+        if not _HAS_NUMPY:
+            yield from self._iter_runs(starts, lengths)
+            return
+        if len(lengths) == 0:
+            return
+        r, r_next, half_next, tok = self._classify_runs_np(lengths)
+        for lo in range(0, r.size, _ITER_CHUNK):
+            hi = lo + _ITER_CHUNK
+            bits:   list[DecodedBit] = []
+            errors: list[BitError]   = []
+            self._emit_runs_np(starts[lo:hi], r[lo:hi], r_next[lo:hi],
+                               half_next[lo:hi], tok[lo:hi], bits, errors)
+            if errors:
+                yield from heapq.merge(bits, errors, key=_sample_pos)
+            else:
+                yield from bits
+
+    def decode_chunked(
+        self,
+        samples: Sequence[int],
+        chunk_size: int = _CHUNK_SAMPLES,
+        as_array: bool = False,
+    ) -> Iterator[tuple[list[DecodedBit], list[BitError]]]:
+        """
+        Decode one long flat sample sequence (list or int16 array) in
+        chunk_size-sample blocks to bound peak memory.  See decode_blocks().
+        """
+        return self.decode_blocks(
+            (samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)),
+            as_array,
+        )
+
+    def decode_blocks(
+        self,
+        blocks: Iterable[Sequence[int]],
+        as_array: bool = False,
+    ) -> Iterator[tuple[list[DecodedBit], list[BitError]]]:
+        """
+        Decode a channel delivered as consecutive sample blocks, e.g. from
+        soundfile.blocks().  Yields (bits, errors) per block, in the same
+        form as decode(samples, as_array); concatenated they equal decode()
+        over the whole stream.
+
+        Carried between blocks: the run still open at the block end (it may
+        continue into the next block) and the last complete run, whose
+        classification needs its successor's length.
+        """
+        if _HAS_NUMPY:
+            as_runs = lambda *v: _np.array(v, dtype=_np.int64)
+            join    = lambda a, b: _np.concatenate((a, b))
+        else:
+            as_runs = lambda *v: list(v)
+            join    = lambda a, b: a + b
+
+        buf_starts, buf_lengths = as_runs(), as_runs()  # complete, not yet consumed
+        open_run = None                                 # (start, length, positive)
+        offset   = 0
+
+        for block in blocks:
+            n = len(block)
+            if not n:
+                continue
+            starts, lengths = self._run_lengths(block)
+            if _HAS_NUMPY:
+                starts  = starts.astype(_np.int64) + offset
+                lengths = lengths.astype(_np.int64)
+            else:
+                starts  = [st + offset for st in starts]
+
+            if open_run is not None:
+                o_start, o_len, o_positive = open_run
+                if len(lengths) and starts[0] == offset and (block[0] > 0) == o_positive:
+                    starts[0]   = o_start           # the open run continues
+                    lengths[0] += o_len
+                else:
+                    starts  = join(as_runs(o_start), starts)
+                    lengths = join(as_runs(o_len), lengths)
+
+            # A run touching the block end may continue into the next block
+            open_run = None
+            if len(lengths) and starts[-1] + lengths[-1] == offset + n:
+                open_run = (int(starts[-1]), int(lengths[-1]), bool(block[-1] > 0))
+                starts, lengths = starts[:-1], lengths[:-1]
+            offset += n
+
+            buf_starts  = join(buf_starts, starts)
+            buf_lengths = join(buf_lengths, lengths)
+            bits:   list[DecodedBit] = []
+            errors: list[BitError]   = []
+            used, vals = self._consume_head(
+                buf_starts, buf_lengths, False, bits, errors, as_array)
+            buf_starts, buf_lengths = buf_starts[used:], buf_lengths[used:]
+            yield (vals if as_array else bits), errors
+
+        if open_run is not None:
+            buf_starts  = join(buf_starts, as_runs(open_run[0]))
+            buf_lengths = join(buf_lengths, as_runs(open_run[1]))
+        bits, errors = [], []
+        _, vals = self._consume_head(buf_starts, buf_lengths, True, bits, errors, as_array)
+        yield (vals if as_array else bits), errors
+
     def tolerance_summary(self) -> str:
         return (
             f"  Nominal bit period : {self.nom_full:.2f} samp  "
@@ -116,28 +295,174 @@ class BMCDecoder:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _run_lengths(self, samples: Sequence[int]) -> list[tuple[int, int]]:
+    def _run_lengths(self, samples: Sequence[int]):
         """
-        Return list of (start_sample_index, run_length) for each contiguous
-        run of positive/negative samples.  Skips silence.
+        Return (starts, lengths) — parallel sequences of start sample index
+        and run length for each contiguous run of positive/negative samples.
+        Skips silence.  int32 arrays with numpy, plain lists without; no
+        per-run tuples either way.
         """
-        runs   = []
+        if _HAS_NUMPY:
+            return self._run_lengths_np(samples)
+
+        starts  = []
+        lengths = []
         i      = 0
         n      = len(samples)
         thresh = self.zero_threshold
+        # "Loud and positive" / "loud and non-positive" as single signed
+        # bounds: once a run's polarity is known the inner loop is one
+        # compare per sample, no abs() and no polarity test.
+        pos_lo = max(thresh, 1)
+        neg_hi = min(-thresh, 0)
 
         while i < n:
             s = samples[i]
-            if abs(s) < thresh:
-                i += 1
-                continue
-            positive = s > 0
-            start    = i
-            while i < n and ((samples[i] > 0) == positive) and abs(samples[i]) >= thresh:
-                i += 1
-            runs.append((start, i - start))
+            start = i
+            i += 1
+            if s >= pos_lo:
+                while i < n and samples[i] >= pos_lo:
+                    i += 1
+            elif s <= neg_hi:
+                while i < n and samples[i] <= neg_hi:
+                    i += 1
+            else:
+                continue        # silence
+            starts.append(start)
+            lengths.append(i - start)
+
+        return starts, lengths
+
+    def _run_lengths_np(self, samples: Sequence[int]):
+        """
+        numpy form of _run_lengths: (starts, lengths) int32 arrays.
+
+        Each sample gets a class — 0 silent, 1 positive, 2 non-positive —
+        and runs are the stretches between class changes.  The class stream
+        is padded with a silent sentinel at both ends so every non-silent
+        run, including one touching either end, starts and ends at a change.
+        """
+        a      = _np.asarray(samples)
+        thresh = self.zero_threshold
+        cls    = _np.zeros(a.size + 2, dtype=_np.uint8)
+        # Branchless: "positive and loud" and "non-positive and loud" are
+        # each one signed compare (no abs, so no int16 wrap), and the two
+        # are disjoint, so class = pos | neg << 1 with no select.
+        body   = cls[1:-1]
+        _np.greater_equal(a, max(thresh, 1), out=body.view(bool))
+        body  |= (a <= min(-thresh, 0)).view(_np.uint8) << 1
+        edges  = _np.flatnonzero(cls[1:] != cls[:-1])  # sample index of each change
+        keep   = cls[edges[:-1] + 1] != 0
+        return (edges[:-1][keep].astype(_np.int32),
+                _np.diff(edges)[keep].astype(_np.int32))
+
+    def _classify_runs_np(self, lengths):
+        """
+        Classify every run in one vectorized pass (the state machine only
+        ever looks one run ahead), then resolve the greedy pairing walk with
+        a single regex substitution over the class bytes.
+
+        Returns (r, r_next, half_next, tok): run lengths, each run's
+        successor length (0 past the end), whether that successor is a half
+        run, and the per-run token byte (see _RUN_*; '#' = consumed as the
+        second half of a pair).
+        """
+        r     = _np.asarray(lengths)
+        n     = r.size
+        full  = (r >= self._full_lo) & (r <= self._full_hi)
+        half  = (r >= self._half_lo) & (r <= self._half_hi)
+        r_next = _np.append(r[1:], 0)
+        sum_full = (r + r_next >= self._full_lo) & (r + r_next <= self._full_hi)
+        half_next = _np.append(half[1:], False)
+        last  = _np.zeros(n, dtype=bool)
+        last[-1:] = True
+
+        # Same precedence as the branches of _consume_runs
+        cls = _np.select(
+            [full, half & last, half & (half_next | sum_full), half],
+            [_RUN_FULL, _RUN_TRAIL, _RUN_PAIR, _RUN_BROKEN],
+            _RUN_BAD,
+        ).astype(_np.uint8)
+        tok = _np.frombuffer(_PAIR_RE.sub(_PAIR_TOKEN, cls.tobytes()), dtype=_np.uint8)
+        return r, r_next, half_next, tok
+
+    def _consume_runs_np(self, starts, lengths, bits, errors):
+        """
+        numpy form of _consume_runs, same output.
+
+        Python-level work is left to building the DecodedBit / BitError
+        tuples.  Returns the decoded bit values as a uint8 array; with
+        bits=None no DecodedBit records are built at all.
+        """
+        if len(lengths) == 0:
+            return _np.zeros(0, dtype=_np.uint8)
+        r, r_next, half_next, tok = self._classify_runs_np(lengths)
+        return self._emit_runs_np(_np.asarray(starts), r, r_next, half_next, tok, bits, errors)
 
-        return runs
+    def _emit_runs_np(self, starts, r, r_next, half_next, tok, bits, errors):
+        """
+        Build the DecodedBit / BitError records for classified runs (any
+        contiguous slice of _classify_runs_np's arrays) and return the bit
+        values as a uint8 array.  bits=None skips the DecodedBit records.
+        """
+        paired = tok == _RUN_PAIR
+        is_full_bit = tok == _RUN_FULL
+        is_bit = paired | is_full_bit | (tok == _RUN_TRAIL)
+        bit_vals = (~is_full_bit[is_bit]).view(_np.uint8)
+        if bits is not None:
+            run_b  = _np.full(r.size, None, dtype=object)
+            run_b[paired] = r_next[paired]
+            in_tol = is_full_bit | (paired & half_next)  # half + rest ≈ full is marginal
+            # tuple.__new__ builds each DecodedBit in C, skipping the
+            # Python-level NamedTuple __new__
+            bits.extend(map(tuple.__new__, repeat(DecodedBit), zip(
+                bit_vals.tolist(),                              # bit
+                starts[is_bit].tolist(),                        # sample_pos
+                r[is_bit].tolist(),                             # run_a
+                run_b[is_bit].tolist(),                         # run_b
+                in_tol[is_bit].tolist(),                        # in_tolerance
+            )))
+
+        # Errors are rare: build their messages with plain Python
+        err_idx = _np.flatnonzero((tok == _RUN_BROKEN) | (tok == _RUN_BAD)).tolist()
+        if err_idx:
+            tok_b = tok.tobytes()
+            for i in err_idx:
+                pos, ri = int(starts[i]), int(r[i])
+                if tok_b[i] == _RUN_BROKEN:
+                    r2 = int(r_next[i])
+                    reason = f"half-run ({ri}) followed by non-half ({r2}), sum={ri + r2}"
+                else:
+                    reason = (
+                        f"run={ri} outside full=[{self._full_lo},{self._full_hi}] "
+                        f"and half=[{self._half_lo},{self._half_hi}]"
+                    )
+                errors.append(BitError(sample_pos=pos, run_length=ri, reason=reason))
+        return bit_vals
+
+    def _consume_head(self, starts, lengths, final, bits, errors, as_array):
+        """
+        decode_blocks step: consume buffered runs.  Unless final, the last
+        run is only look-ahead (its successor is still unknown) and is left
+        for the next call.
+
+        Returns (index of first unconsumed run, bit values if as_array).
+        """
+        n    = len(lengths)
+        stop = n if final else n - 1
+        if stop <= 0:
+            return 0, (_np.zeros(0, dtype=_np.uint8) if _HAS_NUMPY else bytearray())
+        if not _HAS_NUMPY:
+            used = self._consume_runs(starts, lengths, bits, errors, stop)
+            return used, (bytearray(b.bit for b in bits) if as_array else None)
+
+        r, r_next, half_next, tok = self._classify_runs_np(lengths)
+        vals = self._emit_runs_np(
+            starts[:stop], r[:stop], r_next[:stop], half_next[:stop], tok[:stop],
+            None if as_array else bits, errors)
+        # A P token at stop - 1 paired with the look-ahead run at stop
+        used = stop + 1 if stop < n and tok[stop - 1] == _RUN_PAIR else stop
+        return used, vals
 
     def _is_full(self, r: int) -> bool:
         return self._full_lo <= r <= self._full_hi
@@ -147,12 +472,45 @@ class BMCDecoder:
 
     def _consume_runs(
         self,
-        runs: list[tuple[int, int]],
+        starts: Sequence[int],
+        lengths: Sequence[int],
         bits: list[DecodedBit],
         errors: list[BitError],
-    ) -> None:
+        stop: int | None = None,
+    ) -> int:
+        """
+        Walk the (starts, lengths) run arrays and collect the DecodedBits
+        and BitErrors from _iter_runs into bits / errors.  Returns the index
+        of the first run not consumed.
+        """
+        bits_append, errors_append = bits.append, errors.append
+        last = None
+        for last in self._iter_runs(starts, lengths, stop):
+            if type(last) is DecodedBit:
+                bits_append(last)
+            else:
+                errors_append(last)
+        # The walk ends at `stop` unless its final bit paired the run at
+        # stop - 1 with the look-ahead run at stop
+        if stop is None:
+            return len(lengths)
+        if (stop and type(last) is DecodedBit and last.run_b is not None
+                and last.sample_pos == starts[stop - 1]):
+            return stop + 1
+        return stop
+
+    def _iter_runs(
+        self,
+        starts: Sequence[int],
+        lengths: Sequence[int],
+        stop: int | None = None,
+    ) -> Iterator[DecodedBit | BitError]:
         """
-        Walk the run list and emit DecodedBits.
+        Walk the (starts, lengths) run arrays, yielding DecodedBits and
+        BitErrors in stream order.
+
+        With stop, only bits starting before run `stop` are emitted; later
+        runs still serve as look-ahead.
 
         BMC decoding logic
         ------------------
@@ -164,74 +522,80 @@ class BMCDecoder:
               - next run is FULL or missing → bit error (incomplete '1')
         """
         idx = 0
-        total = len(runs)
+        total = len(lengths)
+        if stop is None:
+            stop = total
+        # Window bounds as locals: plain int compares in the loop, no
+        # attribute lookups or _is_full/_is_half method calls per run
+        full_lo, full_hi = self._full_lo, self._full_hi
+        half_lo, half_hi = self._half_lo, self._half_hi
 
-        while idx < total:
-            pos, r = runs[idx]
+        while idx < stop:
+            pos, r = starts[idx], lengths[idx]
 
-            if self._is_full(r):
+            if full_lo <= r <= full_hi:
                 # Bit '0': single full run
-                bits.append(DecodedBit(
+                yield DecodedBit(
                     bit=0,
                     sample_pos=pos,
                     run_a=r,
                     run_b=None,
                     in_tolerance=True,
-                ))
+                )
                 idx += 1
 
-            elif self._is_half(r):
+            elif half_lo <= r <= half_hi:
                 # Potentially bit '1': need a second half run
                 if idx + 1 < total:
-                    pos2, r2 = runs[idx + 1]
-                    if self._is_half(r2):
-                        bits.append(DecodedBit(
+                    r2 = lengths[idx + 1]
+                    if half_lo <= r2 <= half_hi:
+                        yield DecodedBit(
                             bit=1,
                             sample_pos=pos,
                             run_a=r,
                             run_b=r2,
                             in_tolerance=True,
-                        ))
+                        )
                         idx += 2
                     else:
                         # Second run is not half — tolerated if sum ≈ full
                         combined = r + r2
-                        if self._is_full(combined):
+                        if full_lo <= combined <= full_hi:
                             # Close enough — call it a '1' with a timing note
-                            bits.append(DecodedBit(
+                            yield DecodedBit(
                                 bit=1,
                                 sample_pos=pos,
                                 run_a=r,
                                 run_b=r2,
                                 in_tolerance=False,   # marginal
-                            ))
+                            )
                             idx += 2
                         else:
-                            errors.append(BitError(
+                            yield BitError(
                                 sample_pos=pos,
                                 run_length=r,
                                 reason=f"half-run ({r}) followed by non-half ({r2}), sum={combined}",
-                            ))
+                            )
                             idx += 1
                 else:
                     # Trailing half run at end of stream — tolerate
-                    bits.append(DecodedBit(
+                    yield DecodedBit(
                         bit=1,
                         sample_pos=pos,
                         run_a=r,
                         run_b=None,
                         in_tolerance=False,
-                    ))
+                    )
                     idx += 1
 
             else:
                 # Out-of-tolerance run
-                errors.append(BitError(
+                yield BitError(
                     sample_pos=pos,
                     run_length=r,
                     reason=(
                         f"run={r} outside full=[{self._full_lo},{self._full_hi}] "
                         f"and half=[{self._half_lo},{self._half_hi}]"
                     ),
-                ))
+                )
                 idx += 1
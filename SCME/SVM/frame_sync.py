@@ -28,22 +28,48 @@
 # =============================================================================
 
 from __future__ import annotations
-from typing import NamedTuple
+from itertools import compress
+from typing import NamedTuple, Sequence
+
+try:
+    import numpy as _np
+    _HAS_NUMPY = True
+except ImportError:
+    _HAS_NUMPY = False
 
 from SCME.SMM.constants import (
     TD_FRAME_BITS, BD_FRAME_BITS,
     TD_BLANK_BITS, BD_BLANK_BITS,
-    TD_BIT_TO_NAME, BD_BIT_TO_NAME,
+    TD_NAME_BY_BIT, BD_NAME_BY_BIT,
 )
 
 
 class DecodedFrame(NamedTuple):
     frame_index:    int          # sequential frame number
     bit_offset:     int          # index into full bit list where this frame starts
-    bits:           list[int]    # FRAME_BITS length list of 0/1
+    bits:           Sequence[int]  # FRAME_BITS 0/1 values (uint8 row view with numpy)
     active_channels: list[str]   # human-readable list of channels = 1
     blank_ok:       bool         # True if all blank bits are 0
 
+    @property
+    def bits_list(self) -> list[int]:
+        """The frame's bits as a plain list of ints."""
+        bits = self.bits
+        return bits.tolist() if hasattr(bits, "tolist") else list(bits)
+
+    # Value equality whatever form `bits` takes (an ndarray row cannot be
+    # compared with == inside a tuple)
+    def __eq__(self, other):
+        if not isinstance(other, tuple) or len(other) != len(self):
+            return NotImplemented
+        other = DecodedFrame(*other)
+        return (self[:2] == other[:2] and self.bits_list == other.bits_list
+                and self[3:] == other[3:])
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
 
 class SyncResult(NamedTuple):
     locked:       bool
@@ -59,7 +85,7 @@ LOCK_THRESHOLD = 3   # require this many consecutive clean frames to declare loc
 
 
 def sync_frames(
-    bits: list[int],
+    bits: Sequence[int],
     track: str,                  # "TD" or "BD"
     max_search_bits: int = 500,  # search window for lock (bits)
 ) -> SyncResult:
@@ -68,7 +94,8 @@ def sync_frames(
 
     Parameters
     ----------
-    bits             : flat list of 0/1 from BMCDecoder
+    bits             : flat 0/1 sequence from BMCDecoder — a list, or the
+                       uint8 array from decode(as_array=True), used as-is
     track            : "TD" or "BD"
     max_search_bits  : how far into the stream to search for lock
 
@@ -79,16 +106,17 @@ def sync_frames(
     if track == "TD":
         frame_bits  = TD_FRAME_BITS
         blank_bits  = TD_BLANK_BITS      # 1-based bit numbers
-        bit_to_name = TD_BIT_TO_NAME
+        name_array  = TD_NAME_BY_BIT     # channel name per 0-based bit, or None
     elif track == "BD":
         frame_bits  = BD_FRAME_BITS
         blank_bits  = BD_BLANK_BITS
-        bit_to_name = BD_BIT_TO_NAME
+        name_array  = BD_NAME_BY_BIT
     else:
         raise ValueError(f"track must be 'TD' or 'BD', got {track!r}")
 
-    # Convert to 0-based indices
-    blank_indices = {b - 1 for b in blank_bits}
+    # Convert to 0-based indices (a tuple: tested with direct indexing,
+    # no per-frame slice)
+    blank_indices = tuple(sorted(b - 1 for b in blank_bits))
 
     total = len(bits)
 
@@ -98,23 +126,47 @@ def sync_frames(
 
     search_end = min(max_search_bits, total - frame_bits * LOCK_THRESHOLD)
 
-    for candidate in range(search_end):
-        score = 0
-        for k in range(LOCK_THRESHOLD):
-            start = candidate + k * frame_bits
-            end   = start + frame_bits
-            if end > total:
-                break
-            frame_slice = bits[start:end]
-            if all(frame_slice[bi] == 0 for bi in blank_indices):
-                score += 1
-            else:
-                break
-        if score > best_score:
-            best_score  = score
-            best_offset = candidate
-            if score >= LOCK_THRESHOLD:
-                break   # good enough
+    packed = _np.asarray(bits, dtype=_np.uint8) if _HAS_NUMPY else None
+
+    if packed is not None and search_end > 0:
+        # clean_at[s]: a frame starting at bit s has all blank bits 0 —
+        # the OR of the stream shifted by each blank position, one pass
+        # per blank bit over just the span the search can reach.  Each
+        # candidate's LOCK_THRESHOLD frames are then a (search_end,
+        # LOCK_THRESHOLD) gather.  A candidate's score is its run of
+        # leading clean frames (cumprod stops at the first dirty one).  The
+        # loop below takes the first candidate that hits the threshold,
+        # else the first best-scoring one — argmax on the boolean / score
+        # arrays picks exactly the same index.
+        span    = search_end + (LOCK_THRESHOLD - 1) * frame_bits
+        dirty   = _np.zeros(span, dtype=_np.uint8)
+        for bi in blank_indices:
+            dirty |= packed[bi:bi + span]
+        clean_at = dirty == 0
+        offsets = _np.arange(search_end)[:, None]
+        k_off   = (_np.arange(LOCK_THRESHOLD) * frame_bits)[None, :]
+        clean   = clean_at[offsets + k_off]
+        scores  = clean.cumprod(axis=1).sum(axis=1)
+        hits    = scores >= LOCK_THRESHOLD
+        best_offset = int(hits.argmax() if hits.any() else scores.argmax())
+        best_score  = int(scores[best_offset])
+    else:
+        for candidate in range(search_end):
+            score = 0
+            for k in range(LOCK_THRESHOLD):
+                start = candidate + k * frame_bits
+                end   = start + frame_bits
+                if end > total:
+                    break
+                if not any(bits[start + bi] for bi in blank_indices):
+                    score += 1
+                else:
+                    break
+            if score > best_score:
+                best_score  = score
+                best_offset = candidate
+                if score >= LOCK_THRESHOLD:
+                    break   # good enough
 
     locked = best_score >= LOCK_THRESHOLD
 
@@ -122,18 +174,41 @@ def sync_frames(
     frames: list[DecodedFrame] = []
     pos = best_offset
 
+    if packed is not None:
+        # All frames as one (n_frames, frame_bits) matrix: the blank-bit
+        # check is a single column gather, and each frame's bits are a
+        # zero-copy row view.
+        n_frames = max(total - best_offset, 0) // frame_bits
+        matrix = packed[
+            best_offset:best_offset + n_frames * frame_bits
+        ].reshape(n_frames, frame_bits)
+        blank_flags = (~matrix[:, list(blank_indices)].any(axis=1)).tolist()
+        # Active channel names for every frame at once: nonzero() walks the
+        # named columns row-major, so each frame's names come out in bit
+        # order and a cumulative count splits them per frame.
+        named = _np.array([n is not None for n in name_array])
+        hit_rows, hit_cols = _np.nonzero(matrix & named)
+        hit_names = [name_array[i] for i in hit_cols.tolist()]
+        name_ends = _np.bincount(hit_rows, minlength=n_frames).cumsum().tolist()
+    else:
+        blank_flags = matrix = None
+
     while pos + frame_bits <= total:
-        frame_slice = bits[pos:pos + frame_bits]
-        blank_ok    = all(frame_slice[bi] == 0 for bi in blank_indices)
-        active      = [
-            bit_to_name[i + 1]          # 1-based
-            for i, v in enumerate(frame_slice)
-            if v == 1 and (i + 1) in bit_to_name
-        ]
+        if matrix is not None:
+            k = len(frames)
+            frame_slice = matrix[k]
+            blank_ok    = blank_flags[k]
+            active      = hit_names[name_ends[k - 1] if k else 0:name_ends[k]]
+        else:
+            frame_slice = bits[pos:pos + frame_bits]
+            blank_ok    = not any(frame_slice[bi] for bi in blank_indices)
+            # compress() scans the bits in C; only set bits reach the
+            # comprehension, which drops blank/unassigned (None) positions
+            active      = [n for n in compress(name_array, frame_slice) if n is not None]
         frames.append(DecodedFrame(
             frame_index=len(frames),
             bit_offset=pos,
-            bits=list(frame_slice),
+            bits=frame_slice,
             active_channels=active,
             blank_ok=blank_ok,
         ))
@@ -163,6 +238,9 @@ def channel_timeline(
     frame_bits = TD_FRAME_BITS if track == "TD" else BD_FRAME_BITS
     secs_per_frame = frame_bits / baud_rate
 
+    if _HAS_NUMPY and frames:
+        return _channel_timeline_np(frames, secs_per_frame, track)
+
     timeline: dict[str, list[tuple[float, float]]] = {}
     active_since: dict[str, float] = {}
 
@@ -188,3 +266,38 @@ def channel_timeline(
             timeline.setdefault(ch, []).append((t_on, t_end))
 
     return timeline
+
+
+def _channel_timeline_np(
+    frames: list[DecodedFrame],
+    secs_per_frame: float,
+    track: str,
+) -> dict[str, list[tuple[float, float]]]:
+    """
+    numpy form of channel_timeline, same intervals.
+
+    The named bit columns of all frames form one (n_frames, n_channels)
+    matrix; a diff along the frame axis, zero-padded at both ends, is +1
+    where a channel turns on and -1 where it turns off.  Walking the
+    transposed edges keeps each channel's on/off positions in frame order,
+    so the k-th on pairs with the k-th off.  Channels come out in bit order.
+    """
+    name_array = TD_NAME_BY_BIT if track == "TD" else BD_NAME_BY_BIT
+    cols  = [i for i, n in enumerate(name_array) if n is not None]
+    # bytes() of each 0/1 bit list, joined, is far cheaper than np.array
+    # over the nested lists
+    packed = b"".join(map(bytes, (f.bits for f in frames)))
+    bits  = _np.frombuffer(packed, dtype=_np.int8).reshape(len(frames), -1)[:, cols]
+    edges = _np.diff(bits, axis=0, prepend=0, append=0).T
+
+    on_ch, on_pos   = _np.nonzero(edges == 1)
+    off_pos         = _np.nonzero(edges == -1)[1]
+
+    # Start time of each frame position, plus end of stream for position n
+    times = [f.frame_index * secs_per_frame for f in frames]
+    times.append((frames[-1].frame_index + 1) * secs_per_frame)
+
+    timeline: dict[str, list[tuple[float, float]]] = {}
+    for c, p_on, p_off in zip(on_ch.tolist(), on_pos.tolist(), off_pos.tolist()):
+        timeline.setdefault(name_array[cols[c]], []).append((times[p_on], times[p_off]))
+    return timeline
@@ -52,6 +52,20 @@ MIN_BLANK_BIT_RATE  = 0.98   # <98% of frames with correct blank bits = suspect
 
 DIVIDER = "=" * 68
 
+STREAM_BLOCK = 1 << 20   # frames per sf.blocks() read while decoding
+
+
+def _channel_blocks(snd, ch_idx: int):
+    """
+    Yield one channel of the open SoundFile, from the start, as contiguous
+    int16 blocks, so only one block of the file is resident at a time (the
+    decoder carries run state across blocks) and no per-sample Python ints
+    are created.
+    """
+    snd.seek(0)
+    for block in snd.blocks(blocksize=STREAM_BLOCK, dtype='int16', always_2d=True):
+        yield np.ascontiguousarray(block[:, ch_idx])
+
 
 def run_sim(wav_path: str, tolerance: float, track: str, dump_frames: bool) -> bool:
     """
@@ -61,168 +75,193 @@ def run_sim(wav_path: str, tolerance: float, track: str, dump_frames: bool) -> b
     verdict_pass = True
     reasons: list[str] = []
 
+    # p() collects the current section's lines; flush() writes them in one
+    # call at each section end and before every early return
+    out: list[str] = []
+    p = out.append
+
+    def flush() -> None:
+        if out:
+            sys.stdout.write("\n".join(out) + "\n")
+            out.clear()
+
     # -----------------------------------------------------------------------
     # [1] File info
     # -----------------------------------------------------------------------
-    print(f"\n{DIVIDER}")
-    print(f"  Cyberstar Hardware Emulator")
-    print(DIVIDER)
+    p(f"\n{DIVIDER}")
+    p(f"  Cyberstar Hardware Emulator")
+    p(DIVIDER)
 
     if not os.path.exists(wav_path):
-        print(f"  [!!] File not found: {wav_path}")
-        return False
-
-    info = sf.info(wav_path)
-    print(f"  File     : {os.path.basename(wav_path)}")
-    print(f"  Rate     : {info.samplerate} Hz")
-    print(f"  Channels : {info.channels}")
-    print(f"  Duration : {info.frames / info.samplerate:.2f} s  ({info.frames:,} frames)")
-    print(f"  Format   : {info.subtype}")
-
-    data, sr = sf.read(wav_path, dtype='int16', always_2d=True)
-    n_ch = data.shape[1]
-
-    # --- Channel selection ---
-    if n_ch == 4:
-        # Standard Cyberstar layout: Ch1=MusicL, Ch2=MusicR, Ch3=TD, Ch4=BD
-        ch_map = {"TD": 2, "BD": 3}   # 0-based indices
-        print(f"  Layout   : 4-channel Cyberstar (Ch3=TD, Ch4=BD)")
-    elif n_ch == 2:
-        # KWS 2-channel: Ch1=TD, Ch2=BD
-        ch_map = {"TD": 0, "BD": 1}
-        print(f"  Layout   : 2-channel KWS (Ch1=TD, Ch2=BD)")
-    else:
-        print(f"  [!!] Unexpected channel count: {n_ch}")
+        p(f"  [!!] File not found: {wav_path}")
+        flush()
         return False
 
-    tracks_to_run = ["TD", "BD"] if track == "BOTH" else [track]
-
-    for trk in tracks_to_run:
-        ch_idx = ch_map[trk]
-        ch_data = data[:, ch_idx].tolist()
-
-        print(f"\n{DIVIDER}")
-        print(f"  Track: {trk} (Ch{ch_idx + 1})")
-        print(DIVIDER)
-
-        # -------------------------------------------------------------------
-        # [2] Decoder config
-        # -------------------------------------------------------------------
-        dec = BMCDecoder(
-            sample_rate=sr,
-            baud_rate=BAUD_RATE,
-            tolerance=tolerance,
-        )
-        print(f"\n  -- Decoder Configuration --")
-        print(dec.tolerance_summary())
-
-        # -------------------------------------------------------------------
-        # [3] Decode
-        # -------------------------------------------------------------------
-        print(f"\n  -- Decode Report --")
-        bits_decoded, decode_errors = dec.decode(ch_data)
-
-        n_bits   = len(bits_decoded)
-        n_errors = len(decode_errors)
-        error_rate = n_errors / max(n_bits + n_errors, 1)
-
-        print(f"  Bits decoded      : {n_bits:,}")
-        print(f"  Decode errors     : {n_errors:,}")
-        print(f"  Error rate        : {error_rate * 100:.3f}%  (limit: {MAX_ERROR_RATE*100:.1f}%)")
-
-        if error_rate > MAX_ERROR_RATE:
-            verdict_pass = False
-            reasons.append(
-                f"{trk}: error rate {error_rate*100:.2f}% exceeds {MAX_ERROR_RATE*100:.1f}% limit"
-            )
-            print(f"  [FAIL] Error rate too high — hardware would lose lock")
-            if decode_errors[:5]:
-                print(f"  First errors:")
-                for e in decode_errors[:5]:
-                    t = e.sample_pos / sr
-                    print(f"    t={t:.4f}s  run={e.run_length}  {e.reason}")
-        else:
-            print(f"  [PASS] Error rate within tolerance")
-
-        # -------------------------------------------------------------------
-        # [4] Frame sync
-        # -------------------------------------------------------------------
-        print(f"\n  -- Frame Sync Report --")
-        bit_vals = [b.bit for b in bits_decoded]
-        sync     = sync_frames(bit_vals, trk)
-
-        frame_bits = TD_FRAME_BITS if trk == "TD" else BD_FRAME_BITS
-        secs_per_frame = frame_bits / BAUD_RATE
-        total_dur  = len(bit_vals) / BAUD_RATE
-
-        blank_ok_count = sum(1 for f in sync.frames if f.blank_ok)
-        blank_ok_rate  = blank_ok_count / max(len(sync.frames), 1)
-
-        print(f"  Lock status       : {'LOCKED' if sync.locked else 'NO LOCK'}")
-        print(f"  Lock offset       : {sync.lock_offset} bits  ({sync.lock_offset/BAUD_RATE*1000:.1f} ms)")
-        print(f"  Lock score        : {sync.score} consecutive clean frames")
-        print(f"  Orphaned bits     : {sync.orphan_bits}")
-        print(f"  Frames decoded    : {len(sync.frames):,}")
-        print(f"  Blank-bit OK rate : {blank_ok_rate*100:.2f}%  (limit: {MIN_BLANK_BIT_RATE*100:.1f}%)")
-
-        if not sync.locked:
-            verdict_pass = False
-            reasons.append(f"{trk}: failed to lock on frame boundaries")
-            print(f"  [FAIL] No frame lock — hardware cannot decode animation")
+    # One open handle serves the header info and every track's block reads
+    with sf.SoundFile(wav_path) as snd:
+        p(f"  File     : {os.path.basename(wav_path)}")
+        p(f"  Rate     : {snd.samplerate} Hz")
+        p(f"  Channels : {snd.channels}")
+        p(f"  Duration : {snd.frames / snd.samplerate:.2f} s  ({snd.frames:,} frames)")
+        p(f"  Format   : {snd.subtype}")
+
+        sr   = snd.samplerate
+        n_ch = snd.channels
+
+        # --- Channel selection ---
+        if n_ch == 4:
+            # Standard Cyberstar layout: Ch1=MusicL, Ch2=MusicR, Ch3=TD, Ch4=BD
+            ch_map = {"TD": 2, "BD": 3}   # 0-based indices
+            p(f"  Layout   : 4-channel Cyberstar (Ch3=TD, Ch4=BD)")
+        elif n_ch == 2:
+            # KWS 2-channel: Ch1=TD, Ch2=BD
+            ch_map = {"TD": 0, "BD": 1}
+            p(f"  Layout   : 2-channel KWS (Ch1=TD, Ch2=BD)")
         else:
-            print(f"  [PASS] Frame lock acquired")
-
-        if blank_ok_rate < MIN_BLANK_BIT_RATE:
-            verdict_pass = False
-            reasons.append(
-                f"{trk}: blank-bit integrity {blank_ok_rate*100:.1f}% < {MIN_BLANK_BIT_RATE*100:.1f}%"
+            p(f"  [!!] Unexpected channel count: {n_ch}")
+            flush()
+            return False
+        flush()
+
+        tracks_to_run = ["TD", "BD"] if track == "BOTH" else [track]
+
+        for trk in tracks_to_run:
+            ch_idx = ch_map[trk]
+
+            p(f"\n{DIVIDER}")
+            p(f"  Track: {trk} (Ch{ch_idx + 1})")
+            p(DIVIDER)
+
+            # -------------------------------------------------------------------
+            # [2] Decoder config
+            # -------------------------------------------------------------------
+            dec = BMCDecoder(
+                sample_rate=sr,
+                baud_rate=BAUD_RATE,
+                tolerance=tolerance,
             )
-            print(f"  [FAIL] Blank bit violations — frame alignment drifting")
-        else:
-            print(f"  [PASS] Blank bit integrity OK")
-
-        # -------------------------------------------------------------------
-        # [5] Channel timeline
-        # -------------------------------------------------------------------
-        print(f"\n  -- Channel Activity Timeline --")
-        timeline = channel_timeline(sync.frames, sr, BAUD_RATE, trk)
-
-        if not timeline:
-            print(f"  (no channel activations detected)")
-        else:
-            # Show channels sorted by first activation time
-            sorted_chs = sorted(timeline.items(), key=lambda kv: kv[1][0][0])
-            print(f"  {'Channel':<40} {'On (s)':>8}  {'Off (s)':>8}  {'Dur (s)':>8}")
-            print(f"  {'-'*40}  {'-'*8}  {'-'*8}  {'-'*8}")
-            for ch, intervals in sorted_chs:
-                for t_on, t_off in intervals:
-                    dur = t_off - t_on
-                    print(f"  {ch:<40} {t_on:>8.3f}  {t_off:>8.3f}  {dur:>8.3f}")
-
-        # --- Optional frame dump ---
-        if dump_frames:
-            print(f"\n  -- Frame Dump (first 10) --")
-            for f in sync.frames[:10]:
-                bit_str = "".join(str(b) for b in f.bits)
-                print(
-                    f"  Frame {f.frame_index:04d}  "
-                    f"bit[{f.bit_offset}]  "
-                    f"blank={'OK' if f.blank_ok else 'ERR'}  "
-                    f"active={f.active_channels or '[]'}"
+            p(f"\n  -- Decoder Configuration --")
+            p(dec.tolerance_summary())
+            flush()
+
+            # -------------------------------------------------------------------
+            # [3] Decode
+            # -------------------------------------------------------------------
+            p(f"\n  -- Decode Report --")
+            bit_blocks: list = []
+            decode_errors: list = []
+            for vals, errs in dec.decode_blocks(
+                _channel_blocks(snd, ch_idx), as_array=True
+            ):
+                bit_blocks.append(vals)
+                decode_errors.extend(errs)
+            bit_vals = np.concatenate(bit_blocks)
+
+            n_bits   = len(bit_vals)
+            n_errors = len(decode_errors)
+            error_rate = n_errors / max(n_bits + n_errors, 1)
+
+            p(f"  Bits decoded      : {n_bits:,}")
+            p(f"  Decode errors     : {n_errors:,}")
+            p(f"  Error rate        : {error_rate * 100:.3f}%  (limit: {MAX_ERROR_RATE*100:.1f}%)")
+
+            if error_rate > MAX_ERROR_RATE:
+                verdict_pass = False
+                reasons.append(
+                    f"{trk}: error rate {error_rate*100:.2f}% exceeds {MAX_ERROR_RATE*100:.1f}% limit"
+                )
+                p(f"  [FAIL] Error rate too high — hardware would lose lock")
+                if decode_errors[:5]:
+                    p(f"  First errors:")
+                    for e in decode_errors[:5]:
+                        t = e.sample_pos / sr
+                        p(f"    t={t:.4f}s  run={e.run_length}  {e.reason}")
+            else:
+                p(f"  [PASS] Error rate within tolerance")
+            flush()
+
+            # -------------------------------------------------------------------
+            # [4] Frame sync
+            # -------------------------------------------------------------------
+            p(f"\n  -- Frame Sync Report --")
+            sync     = sync_frames(bit_vals, trk)
+
+            frame_bits = TD_FRAME_BITS if trk == "TD" else BD_FRAME_BITS
+            secs_per_frame = frame_bits / BAUD_RATE
+            total_dur  = len(bit_vals) / BAUD_RATE
+
+            blank_ok_count = sum(1 for f in sync.frames if f.blank_ok)
+            blank_ok_rate  = blank_ok_count / max(len(sync.frames), 1)
+
+            p(f"  Lock status       : {'LOCKED' if sync.locked else 'NO LOCK'}")
+            p(f"  Lock offset       : {sync.lock_offset} bits  ({sync.lock_offset/BAUD_RATE*1000:.1f} ms)")
+            p(f"  Lock score        : {sync.score} consecutive clean frames")
+            p(f"  Orphaned bits     : {sync.orphan_bits}")
+            p(f"  Frames decoded    : {len(sync.frames):,}")
+            p(f"  Blank-bit OK rate : {blank_ok_rate*100:.2f}%  (limit: {MIN_BLANK_BIT_RATE*100:.1f}%)")
+
+            if not sync.locked:
+                verdict_pass = False
+                reasons.append(f"{trk}: failed to lock on frame boundaries")
+                p(f"  [FAIL] No frame lock — hardware cannot decode animation")
+            else:
+                p(f"  [PASS] Frame lock acquired")
+
+            if blank_ok_rate < MIN_BLANK_BIT_RATE:
+                verdict_pass = False
+                reasons.append(
+                    f"{trk}: blank-bit integrity {blank_ok_rate*100:.1f}% < {MIN_BLANK_BIT_RATE*100:.1f}%"
                 )
-                print(f"    bits: {bit_str[:47]}...")
+                p(f"  [FAIL] Blank bit violations — frame alignment drifting")
+            else:
+                p(f"  [PASS] Blank bit integrity OK")
+            flush()
+
+            # -------------------------------------------------------------------
+            # [5] Channel timeline
+            # -------------------------------------------------------------------
+            p(f"\n  -- Channel Activity Timeline --")
+            timeline = channel_timeline(sync.frames, sr, BAUD_RATE, trk)
+
+            if not timeline:
+                p(f"  (no channel activations detected)")
+            else:
+                # Show channels sorted by first activation time
+                sorted_chs = sorted(timeline.items(), key=lambda kv: kv[1][0][0])
+                p(f"  {'Channel':<40} {'On (s)':>8}  {'Off (s)':>8}  {'Dur (s)':>8}")
+                p(f"  {'-'*40}  {'-'*8}  {'-'*8}  {'-'*8}")
+                for ch, intervals in sorted_chs:
+                    for t_on, t_off in intervals:
+                        dur = t_off - t_on
+                        p(f"  {ch:<40} {t_on:>8.3f}  {t_off:>8.3f}  {dur:>8.3f}")
+            flush()
+
+            # --- Optional frame dump ---
+            if dump_frames:
+                p(f"\n  -- Frame Dump (first 10) --")
+                for f in sync.frames[:10]:
+                    bit_str = "".join(map(str, f.bits_list))
+                    p(
+                        f"  Frame {f.frame_index:04d}  "
+                        f"bit[{f.bit_offset}]  "
+                        f"blank={'OK' if f.blank_ok else 'ERR'}  "
+                        f"active={f.active_channels or '[]'}"
+                    )
+                    p(f"    bits: {bit_str[:47]}...")
+                flush()
 
     # -----------------------------------------------------------------------
     # [6] Verdict
     # -----------------------------------------------------------------------
-    print(f"\n{DIVIDER}")
+    p(f"\n{DIVIDER}")
     if verdict_pass:
-        print(f"  VERDICT: PASS — hardware would accept this signal")
+        p(f"  VERDICT: PASS — hardware would accept this signal")
     else:
-        print(f"  VERDICT: FAIL — hardware would reject this signal")
+        p(f"  VERDICT: FAIL — hardware would reject this signal")
         for r in reasons:
-            print(f"    - {r}")
-    print(f"{DIVIDER}\n")
+            p(f"    - {r}")
+    p(f"{DIVIDER}\n")
+    flush()
 
     return verdict_pass
 
@@ -145,15 +145,14 @@
     // 2. Load Pyodide + SAM bridge ------------------------------------------
     const pyodide = await _ensureSAMPyodide();
 
-    // 3. Convert to Python-compatible list -----------------------------------
-    // Pyodide can accept typed arrays directly, but converting to a plain JS
-    // array is the most reliable way across Pyodide versions.
+    // 3. Hand the Int16Array over as-is --------------------------------------
+    // Python receives it as a JsProxy and views the underlying bytes as int16
+    // (show_bridge._as_pcm16) — no per-sample Array.from() / list conversion.
     report(`Running Python analysis on ${durationSec}s of audio…`);
-    const samplesArray = Array.from(int16);
 
     // 4. Call the Python bridge ----------------------------------------------
     const fn = pyodide.globals.get("analyze_and_choreograph_json");
-    const jsonStr = fn(samplesArray, TARGET_SR, band, title, durationMs);
+    const jsonStr = fn(int16, TARGET_SR, band, title, durationMs);
 
     // 5. Parse and validate --------------------------------------------------
     const result = JSON.parse(jsonStr);